@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Production entry point for the D&D Note-Taking backend.
+
+Runs server:app under uvicorn with several worker processes, uvloop and httptools.
+Every worker imports the app itself and opens its own MongoDB client in the startup
+hook, so nothing connection-related is shared across processes. With more than one
+worker the in-process read cache switches to shared invalidation (READ_CACHE_SHARED):
+a write bumps a version in MongoDB that every worker checks before serving a cached value.
+
+Settings (environment):
+    HOST, PORT                          Bind address (0.0.0.0:8001)
+    WEB_CONCURRENCY                     Worker processes (usable CPU cores)
+    UVICORN_KEEP_ALIVE_SECONDS          Idle keep-alive timeout (5)
+    UVICORN_GRACEFUL_SHUTDOWN_SECONDS   Time to finish in-flight requests on shutdown (30)
+    UVICORN_BACKLOG                     Listen backlog (2048)
+    UVICORN_LIMIT_CONCURRENCY           Per-worker connection limit before 503s (unlimited)
+    UVICORN_LIMIT_MAX_REQUESTS          Recycle a worker after this many requests (never)
+    UVICORN_ACCESS_LOG                  Log every request (false)
+    UVICORN_LOG_LEVEL                   Log level (info)
+    FORWARDED_ALLOW_IPS                 Proxies trusted for X-Forwarded-* headers (127.0.0.1)
+    UVICORN_RELOAD                      Development auto-reload, single worker (false)
+    MONGO_MAX_POOL_SIZE, MONGO_*_MS     Motor pool and timeouts, see server.py
+
+Usage:
+    python serve.py
+    WEB_CONCURRENCY=8 MONGO_MAX_POOL_SIZE=50 python serve.py
+"""
+
+import importlib.util
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+logger = logging.getLogger("serve")
+
+
+def env_int(name, default=None):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def env_flag(name, default=False):
+    value = os.environ.get(name)
+    return value.lower() in ("1", "true", "yes") if value else default
+
+
+def usable_cores():
+    # Respects CPU affinity (taskset, container cpusets) where the platform reports it
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def prepare_prometheus_multiprocess_dir(workers):
+    """Workers write metrics to a shared directory so /metrics can aggregate them"""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if workers <= 1 and not directory:
+        return
+    if not directory:
+        directory = tempfile.mkdtemp(prefix="dnd-notes-prometheus-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+    # Files left by a previous run would be aggregated with the new workers
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for stale in path.glob("*.db"):
+        stale.unlink()
+
+
+def share_read_cache(workers):
+    """A write only reaches the cache of the worker that handled it unless invalidation is shared"""
+    if workers > 1:
+        os.environ["READ_CACHE_SHARED"] = "true"
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    reload = env_flag("UVICORN_RELOAD")
+    workers = 1 if reload else env_int("WEB_CONCURRENCY", usable_cores())
+
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    if loop != "uvloop" or http != "httptools":
+        logger.warning(f"uvloop/httptools not installed, falling back to loop={loop} http={http}")
+
+    prepare_prometheus_multiprocess_dir(workers)
+    share_read_cache(workers)
+    logger.info(f"Starting {workers} worker(s) with loop={loop} http={http}")
+
+    uvicorn.run(
+        "server:app",
+        app_dir=str(Path(__file__).resolve().parent),
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=env_int("PORT", 8001),
+        workers=workers,
+        reload=reload,
+        loop=loop,
+        http=http,
+        lifespan="on",
+        timeout_keep_alive=env_int("UVICORN_KEEP_ALIVE_SECONDS", 5),
+        timeout_graceful_shutdown=env_int("UVICORN_GRACEFUL_SHUTDOWN_SECONDS", 30),
+        backlog=env_int("UVICORN_BACKLOG", 2048),
+        limit_concurrency=env_int("UVICORN_LIMIT_CONCURRENCY"),
+        limit_max_requests=env_int("UVICORN_LIMIT_MAX_REQUESTS"),
+        access_log=env_flag("UVICORN_ACCESS_LOG"),
+        log_level=os.environ.get("UVICORN_LOG_LEVEL", "info"),
+        proxy_headers=True,
+        forwarded_allow_ips=os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,380 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, Response, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo import monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Optional, Dict, Any, Union
 import uuid
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import secrets
 import re
 import json
+import base64
+import time
+import hashlib
+import zipfile
+import orjson
+import asyncio
+import httpx
+import sys
+import threading
+from collections import OrderedDict
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Prometheus metrics
+# HTTP metrics are labelled with the route template ("/api/sessions/{session_id}"),
+# never the raw path, so label cardinality stays bounded.
+HTTP_REQUEST_DURATION = Histogram(
+    "dnd_http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "dnd_http_requests_in_flight", "HTTP requests currently being served",
+    ["method"], multiprocess_mode="livesum"
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "dnd_http_response_size_bytes", "HTTP response body size by route template",
+    ["method", "route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "dnd_mongo_command_duration_seconds", "MongoDB command latency",
+    ["command", "collection", "outcome"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    "dnd_mongo_pool_connections", "MongoDB pool connections, open and checked out",
+    ["address", "state"], multiprocess_mode="livesum"
+)
+MONGO_POOL_MAX_SIZE = Gauge(
+    "dnd_mongo_pool_max_size", "Configured maximum MongoDB pool size per server",
+    multiprocess_mode="max"
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    "dnd_mongo_pool_checkout_failures_total", "Failed MongoDB connection checkouts",
+    ["address", "reason"]
+)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Observes the duration of every MongoDB command"""
+    
+    def __init__(self):
+        self.collections = {}
+    
+    def started(self, event):
+        target = event.command.get("collection") if event.command_name == "getMore" else event.command.get(event.command_name)
+        self.collections[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ""
+    
+    def record(self, event, outcome: str):
+        collection = self.collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_DURATION.labels(event.command_name, collection, outcome).observe(event.duration_micros / 1_000_000)
+    
+    def succeeded(self, event):
+        self.record(event, "succeeded")
+    
+    def failed(self, event):
+        self.record(event, "failed")
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Tracks open and checked-out connections of the Motor connection pool"""
+    
+    def connections(self, event, state: str):
+        return MONGO_POOL_CONNECTIONS.labels("%s:%s" % event.address, state)
+    
+    def connection_created(self, event):
+        self.connections(event, "open").inc()
+    
+    def connection_closed(self, event):
+        self.connections(event, "open").dec()
+    
+    def connection_checked_out(self, event):
+        self.connections(event, "checked_out").inc()
+    
+    def connection_checked_in(self, event):
+        self.connections(event, "checked_out").dec()
+    
+    def connection_check_out_failed(self, event):
+        MONGO_POOL_CHECKOUT_FAILURES.labels("%s:%s" % event.address, str(event.reason)).inc()
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_check_out_started(self, event):
+        pass
+
+# Slow query recorder
+# Reads and writes slower than SLOW_QUERY_MS are grouped by command, collection and
+# filter shape (field names and operators with the values stripped). When explain
+# capture is on, the first slow run of a shape, and then at most one run per
+# SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS, is re-run with explain("executionStats") to
+# record documents examined and whether the plan was a COLLSCAN.
+SLOW_QUERY_COMMANDS = {"find", "update", "findAndModify", "aggregate", "count", "delete", "distinct"}
+SLOW_QUERY_IGNORED_FIELDS = {"lsid", "$db", "$clusterTime", "txnNumber", "$readPreference", "cursor", "autocommit", "startTransaction"}
+
+def query_shape(value):
+    """Replace the values of a filter with "?" while keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+        return [query_shape(item) for item in value]
+    return "?"
+
+def command_filter(command_name: str, command: dict) -> dict:
+    if command_name in ("find", "distinct"):
+        return command.get("filter") or command.get("query") or {}
+    if command_name in ("findAndModify", "count"):
+        return command.get("query") or {}
+    if command_name == "update":
+        return (command.get("updates") or [{}])[0].get("q", {})
+    if command_name == "delete":
+        return (command.get("deletes") or [{}])[0].get("q", {})
+    return {}
+
+def command_shape(command_name: str, command: dict) -> dict:
+    if command_name == "aggregate":
+        pipeline = command.get("pipeline") or []
+        first_match = next((stage["$match"] for stage in pipeline if "$match" in stage), {})
+        return {"$match": query_shape(first_match), "stages": [next(iter(stage)) for stage in pipeline]}
+    return query_shape(command_filter(command_name, command))
+
+def find_in_explain(value, key: str):
+    """Every value stored under key anywhere in an explain document"""
+    if isinstance(value, dict):
+        for item_key, item in value.items():
+            if item_key == key:
+                yield item
+            yield from find_in_explain(item, key)
+    elif isinstance(value, list):
+        for item in value:
+            yield from find_in_explain(item, key)
+
+def explain_summary(explain: dict) -> dict:
+    plans = list(find_in_explain(explain, "winningPlan"))
+    stages = [stage for plan in plans for stage in find_in_explain(plan, "stage")]
+    docs_examined = list(find_in_explain(explain, "totalDocsExamined"))
+    keys_examined = list(find_in_explain(explain, "totalKeysExamined"))
+    returned = list(find_in_explain(explain, "nReturned"))
+    return {
+        "collscan": "COLLSCAN" in stages,
+        "stages": stages,
+        "docs_examined": sum(docs_examined) if docs_examined else None,
+        "keys_examined": sum(keys_examined) if keys_examined else None,
+        "returned": returned[0] if returned else None,
+    }
+
+class SlowQueryRecorder(monitoring.CommandListener):
+    """Groups slow MongoDB commands by filter shape and captures their plans"""
+    
+    def __init__(self, threshold_ms: float = 100.0, explain: bool = True, explain_interval_seconds: float = 300.0,
+                 max_entries: int = 500):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.explain_interval_seconds = explain_interval_seconds
+        self.max_entries = max_entries
+        self.commands = {}
+        self.entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.client = None
+        self.loop = None
+    
+    def start(self, client, loop):
+        """Explains run on the event loop with this client; without start() nothing is explained"""
+        self.client = client
+        self.loop = loop
+    
+    def started(self, event):
+        if event.command_name in SLOW_QUERY_COMMANDS:
+            self.commands[(event.connection_id, event.request_id)] = event.command
+    
+    def failed(self, event):
+        self.commands.pop((event.connection_id, event.request_id), None)
+    
+    def succeeded(self, event):
+        command = self.commands.pop((event.connection_id, event.request_id), None)
+        if command is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.threshold_ms:
+            return
+        
+        collection = command.get(event.command_name)
+        shape = command_shape(event.command_name, command)
+        key = (event.command_name, collection, orjson.dumps(shape, option=orjson.OPT_SORT_KEYS))
+        now = time.time()
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                entry = {
+                    "command": event.command_name,
+                    "database": event.database_name,
+                    "collection": collection,
+                    "shape": shape,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "last_ms": 0.0,
+                    "last_seen": None,
+                    "explain": None,
+                    "explained_at": 0.0,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_ms"] = duration_ms
+            entry["last_seen"] = datetime.utcnow()
+            self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            explain = (self.explain and self.loop is not None
+                       and now - entry["explained_at"] >= self.explain_interval_seconds)
+            if explain:
+                entry["explained_at"] = now
+        
+        if explain:
+            asyncio.run_coroutine_threadsafe(self.capture_explain(entry, event.command_name, event.database_name, command, duration_ms), self.loop)
+        else:
+            logger.warning(f"Slow {event.command_name} on {collection} ({duration_ms:.1f} ms): {shape}")
+    
+    async def capture_explain(self, entry: dict, command_name: str, database_name: str, command: dict, duration_ms: float):
+        body = {key: value for key, value in command.items() if key not in SLOW_QUERY_IGNORED_FIELDS}
+        # explain accepts a single update or delete statement
+        for statements in ("updates", "deletes"):
+            if statements in body:
+                body[statements] = body[statements][:1]
+        if command_name == "aggregate":
+            body["cursor"] = {}
+        try:
+            explain = await self.client[database_name].command({"explain": body, "verbosity": "executionStats"})
+            summary = explain_summary(explain)
+        except PyMongoError as e:
+            summary = {"error": str(e)}
+        entry["explain"] = summary
+        logger.warning(
+            f"Slow {command_name} on {entry['collection']} ({duration_ms:.1f} ms, "
+            f"docs examined: {summary.get('docs_examined')}{', COLLSCAN' if summary.get('collscan') else ''}): {entry['shape']}"
+        )
+    
+    def worst(self, limit: int = 20, sort: str = "total_ms") -> List[dict]:
+        with self.lock:
+            entries = [dict(entry) for entry in self.entries.values()]
+        entries.sort(key=lambda entry: entry[sort], reverse=True)
+        for entry in entries:
+            entry["mean_ms"] = round(entry["total_ms"] / entry["count"], 3)
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+            entry["last_ms"] = round(entry["last_ms"], 3)
+            entry["collscan"] = bool(entry["explain"] and entry["explain"].get("collscan"))
+            del entry["explained_at"]
+        return entries[:limit]
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+slow_query_recorder = SlowQueryRecorder(
+    threshold_ms=float(os.environ.get('SLOW_QUERY_MS', '100')),
+    explain=os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() in ('1', 'true', 'yes'),
+    explain_interval_seconds=float(os.environ.get('SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS', '300')),
+)
+
+class PrometheusMiddleware:
+    """ASGI middleware recording latency, in-flight requests and response size"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status_code = 500
+        size = 0
+        
+        async def send_with_metrics(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+        
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            in_flight.dec()
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(method, template, str(status_code)).observe(time.perf_counter() - start)
+            HTTP_RESPONSE_SIZE.labels(method, template).observe(size)
+
 # MongoDB connection
+# The client is created by the startup hook of each worker process rather than at
+# import, so every uvicorn worker owns its connection pool and monitoring threads.
+# Each worker opens up to MONGO_MAX_POOL_SIZE connections.
 mongo_url = os.environ.get('MONGO_URL') or os.environ.get('MONGODB_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DATABASE_NAME', os.environ.get('DB_NAME', 'dnd_notes'))]
+database_name = os.environ.get('DATABASE_NAME', os.environ.get('DB_NAME', 'dnd_notes'))
+MONGO_CLIENT_ENV_OPTIONS = {
+    'MONGO_MAX_POOL_SIZE': 'maxPoolSize',
+    'MONGO_MIN_POOL_SIZE': 'minPoolSize',
+    'MONGO_MAX_IDLE_TIME_MS': 'maxIdleTimeMS',
+    'MONGO_WAIT_QUEUE_TIMEOUT_MS': 'waitQueueTimeoutMS',
+    'MONGO_CONNECT_TIMEOUT_MS': 'connectTimeoutMS',
+    'MONGO_SOCKET_TIMEOUT_MS': 'socketTimeoutMS',
+    'MONGO_SERVER_SELECTION_TIMEOUT_MS': 'serverSelectionTimeoutMS',
+}
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+def mongo_client_options() -> dict:
+    """Pool and timeout options set in the environment; unset ones keep the driver defaults"""
+    return {option: int(os.environ[name]) for name, option in MONGO_CLIENT_ENV_OPTIONS.items() if os.environ.get(name)}
+
+def connect_mongo():
+    global client, db
+    client = AsyncIOMotorClient(
+        mongo_url,
+        event_listeners=[MongoCommandMetrics(), MongoPoolMetrics(), slow_query_recorder],
+        **mongo_client_options()
+    )
+    db = client[database_name]
+    MONGO_POOL_MAX_SIZE.set(client.options.pool_options.max_pool_size)
+
+def close_mongo():
+    global client, db
+    if client is not None:
+        client.close()
+        client = None
+        db = None
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -31,11 +385,14 @@ api_router = APIRouter(prefix="/api")
 # Basic authentication
 security = HTTPBasic()
 
+def valid_credentials(username: str, password: str) -> bool:
+    correct_username = secrets.compare_digest(username, "admin")
+    correct_password = secrets.compare_digest(password, "admin")
+    return correct_username and correct_password
+
 # Simple auth function
 def authenticate(credentials: HTTPBasicCredentials = Depends(security)):
-    correct_username = secrets.compare_digest(credentials.username, "admin")
-    correct_password = secrets.compare_digest(credentials.password, "admin")
-    if not (correct_username and correct_password):
+    if not valid_credentials(credentials.username, credentials.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -81,6 +438,15 @@ class Campaign(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class CampaignStats(BaseModel):
+    campaign_id: str
+    session_count: int = 0
+    npc_count: int = 0  # Distinct NPCs encountered or mentioned in the campaign's sessions
+    player_count: int = 0
+    active_player_count: int = 0
+    last_session_date: Optional[Union[str, date]] = None
+    last_session_created_at: Optional[datetime] = None
+
 # Enhanced Pydantic Models for Structured Sessions
 class CombatEncounter(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -145,6 +511,15 @@ class SessionUpdate(BaseModel):
     structured_data: Optional[SessionStructuredData] = None
     session_type: Optional[str] = None
 
+class StructuredDataOperation(BaseModel):
+    op: str = Field(pattern="^(add|update|remove)$")
+    section: str = Field(pattern="^(combat_encounters|roleplay_encounters|npcs_encountered|loot|overarching_missions)$")
+    item_id: Optional[str] = None  # Required for update and remove
+    item: Dict[str, Any] = Field(default_factory=dict)  # Full item for add, changed fields for update
+
+class StructuredDataPatch(BaseModel):
+    operations: List[StructuredDataOperation] = Field(min_length=1, max_length=200)
+
 class Session(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
@@ -156,6 +531,16 @@ class Session(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class SessionSummary(BaseModel):
+    """Lightweight session listing used by view=summary"""
+    id: str
+    title: str
+    campaign_id: str
+    session_number: Optional[int] = None
+    session_date: Optional[Union[str, date]] = None
+    created_at: datetime
+    updated_at: datetime
+
 # NPC Models (keeping existing structure)
 class NPCCreate(BaseModel):
     name: str
@@ -187,66 +572,401 @@ class NPC(BaseModel):
     quirks_mannerisms: str = ""
     background: str = ""
     notes: str = ""
-    history: List[Dict[str, Any]] = Field(default_factory=list)
+    history: List[Dict[str, Any]] = Field(default_factory=list)  # Most recent interactions only
+    interaction_count: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+class NPCInteraction(BaseModel):
+    """Full interaction history lives in the npc_interactions collection"""
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    npc_id: str
+    session_id: str
+    interaction: str
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+class NPCExtractionItem(BaseModel):
+    npc_name: str
+    extracted_text: str
+
+class NPCBulkExtraction(BaseModel):
+    session_id: str
+    items: List[NPCExtractionItem] = Field(default_factory=list, max_length=500)
+
+class NPCExtractionResult(BaseModel):
+    npc_name: str
+    action: str  # "created" or "updated"
+    npc_id: Optional[str] = None  # None only if the NPC was deleted while the batch was written
+
+# Search Models
+class SearchHit(BaseModel):
+    type: str  # "session" or "npc"
+    id: str
+    title: str
+    campaign_id: Optional[str] = None
+    score: float
+    field: str = ""  # Field the snippet was taken from
+    snippet: str = ""
+    highlights: List[List[int]] = Field(default_factory=list)  # [start, end) offsets into snippet
+
+class SearchResults(BaseModel):
+    query: str
+    results: List[SearchHit] = Field(default_factory=list)
+    next_offset: Optional[int] = None
+
 class NPCExtraction(BaseModel):
     session_id: str
     extracted_text: str
     npc_name: str
 
-# Ollama LLM Placeholder Class
+# Background Job Models
+class JobCreate(BaseModel):
+    type: str = Field(..., pattern="^(suggest_npcs|summarize_interaction)$")
+    text: str = Field(..., max_length=1_000_000)
+
+class Job(BaseModel):
+    id: str
+    type: str
+    status: str  # "queued", "running", "completed" or "failed"
+    attempts: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+# NPC name matching
+def npc_name_key(name: str) -> str:
+    """Case-insensitive key with exactly one character per character of name"""
+    return "".join(ch.lower()[:1] for ch in name)
+
+class NPCNameMatcher:
+    """
+    Aho-Corasick automaton over the names of known NPCs.
+    Finds every known name in a text in one pass, independent of how many NPCs exist.
+    Names are added to the trie incrementally and failure links are recomputed
+    lazily on the next search; removed names are simply no longer reported.
+    """
+    
+    def __init__(self, refresh_seconds: float = 300.0):
+        self.refresh_seconds = refresh_seconds
+        self.loaded_at: Optional[float] = None
+        self.names_by_id: Dict[str, str] = {}
+        self.ids_by_key: Dict[str, set] = {}
+        self.reset_trie()
+    
+    def reset_trie(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.terminals: List[List[tuple]] = [[]]  # (name key, length) ending at each node
+        self.matches: List[List[tuple]] = [[]]  # terminals including those reached via failure links
+        self.dirty = False
+    
+    def insert(self, key: str):
+        node = 0
+        for ch in key:
+            next_node = self.goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.terminals.append([])
+                self.matches.append([])
+                self.goto[node][ch] = next_node
+            node = next_node
+        if not any(existing == key for existing, _ in self.terminals[node]):
+            self.terminals[node].append((key, len(key)))
+            self.dirty = True
+    
+    def build_links(self):
+        """Recompute failure links breadth-first"""
+        queue = []
+        for child in self.goto[0].values():
+            self.fail[child] = 0
+            self.matches[child] = list(self.terminals[child])
+            queue.append(child)
+        for node in queue:
+            for ch, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0)
+                self.matches[child] = self.terminals[child] + self.matches[self.fail[child]]
+                queue.append(child)
+        self.dirty = False
+    
+    def set(self, npc_id: str, name: str):
+        """Add an NPC or change its name"""
+        name = (name or "").strip()
+        if self.names_by_id.get(npc_id) == name:
+            return
+        self.discard(npc_id)
+        if not name:
+            return
+        key = npc_name_key(name)
+        self.names_by_id[npc_id] = name
+        self.ids_by_key.setdefault(key, set()).add(npc_id)
+        self.insert(key)
+    
+    def discard(self, npc_id: str):
+        name = self.names_by_id.pop(npc_id, None)
+        if name is None:
+            return
+        key = npc_name_key(name)
+        ids = self.ids_by_key.get(key)
+        if ids:
+            ids.discard(npc_id)
+            if not ids:
+                del self.ids_by_key[key]
+    
+    def load(self, npcs: List[dict]):
+        """Replace the known names with the given NPC documents"""
+        self.names_by_id = {}
+        self.ids_by_key = {}
+        self.reset_trie()
+        for npc in npcs:
+            self.set(npc["id"], npc.get("name", ""))
+        self.loaded_at = time.monotonic()
+    
+    async def ensure_loaded(self, database):
+        """Load names on first use and periodically after, to pick up other workers' writes"""
+        if self.loaded_at is None or time.monotonic() - self.loaded_at > self.refresh_seconds:
+            npcs = await database.npcs.find({}, {"_id": 0, "id": 1, "name": 1}).to_list(None)
+            self.load(npcs)
+    
+    def expire(self):
+        """Reload all names from the database on next use"""
+        self.loaded_at = None
+    
+    def is_known(self, name: str) -> bool:
+        return npc_name_key(name.strip()) in self.ids_by_key
+    
+    def find(self, text: str) -> List[tuple]:
+        """Return (position, name) for every whole-word occurrence of a known name"""
+        if self.dirty:
+            self.build_links()
+        found = []
+        node = 0
+        for i, ch in enumerate(text):
+            ch = ch.lower()[:1]
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for key, length in self.matches[node]:
+                ids = self.ids_by_key.get(key)
+                if not ids:
+                    continue
+                start = i - length + 1
+                if (start > 0 and text[start - 1].isalnum()) or (i + 1 < len(text) and text[i + 1].isalnum()):
+                    continue
+                found.append((start, self.names_by_id[next(iter(ids))]))
+        return found
+
+npc_name_matcher = NPCNameMatcher(refresh_seconds=float(os.environ.get('NPC_MATCHER_REFRESH_SECONDS', '300')))
+
+# Capitalised-phrase heuristics for names that are not known NPCs yet:
+# "Thorin the Blacksmith", "John Smith" and "NPC: Character Name"
+NPC_NAME_PATTERN = re.compile(r'\b([A-Z][a-z]+ (?:the )?[A-Z][a-z]+)\b|NPC:\s*([A-Za-z\s]+)')
+NPC_COMMON_WORDS = {'The Game', 'The Party', 'The Group', 'Game Master', 'Dungeon Master'}
+
+def unique_npc_names(names) -> List[str]:
+    """Strip names and drop common words and case-insensitive duplicates, keeping order"""
+    unique_names = []
+    seen = set()
+    for name in names:
+        name = name.strip() if isinstance(name, str) else ""
+        if not name or name in NPC_COMMON_WORDS or name.lower() in seen:
+            continue
+        seen.add(name.lower())
+        unique_names.append(name)
+    return unique_names
+
+NPC_EXTRACTION_PROMPT = """You read Dungeons & Dragons session notes and list the non-player characters mentioned in them.
+Reply with JSON of the form {{"npcs": ["Name", ...]}} containing each character name exactly once, spelled as in the notes.
+
+Session notes:
+{text}"""
+
+SUMMARY_PROMPT = """Summarize this interaction from a Dungeons & Dragons session in one short sentence.
+Reply with the sentence only.
+
+Interaction:
+{text}"""
+
+class OllamaUnavailable(Exception):
+    """Raised when the Ollama server cannot serve a generation"""
+
+# Ollama LLM service
 class OllamaLLMService:
     """
-    Placeholder class for Ollama LLM integration.
-    Currently uses rule-based logic, but designed to be easily replaced
-    with actual Ollama API calls.
+    Ollama client with rule-based fallbacks.
+    All calls share one pooled httpx.AsyncClient and a semaphore bounds in-flight
+    generations, so concurrent requests queue instead of exhausting connections.
+    When no base URL is configured, or the server is unreachable, the rule-based
+    logic is used; after a failure the server is not retried for retry_after_seconds.
     """
     
-    def __init__(self):
-        self.enabled = False  # Set to True when Ollama is configured
-        
-    async def extract_npcs_from_text(self, text: str) -> List[str]:
+    def __init__(
+        self,
+        name_matcher: Optional[NPCNameMatcher] = None,
+        base_url: Optional[str] = None,
+        model: str = "llama3",
+        max_concurrency: int = 2,
+        timeout_seconds: float = 60.0,
+        connect_timeout_seconds: float = 5.0,
+        queue_timeout_seconds: float = 30.0,
+        retry_after_seconds: float = 30.0,
+        max_prompt_chars: int = 16000,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.name_matcher = name_matcher
+        self.base_url = (base_url or "").rstrip("/")
+        self.enabled = bool(self.base_url)
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds)
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.max_prompt_chars = max_prompt_chars
+        self.transport = transport
+        self.client: Optional[httpx.AsyncClient] = None
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.unavailable_until = 0.0
+    
+    @property
+    def available(self) -> bool:
+        return self.enabled and time.monotonic() >= self.unavailable_until
+    
+    def get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+                transport=self.transport,
+            )
+        return self.client
+    
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+    
+    async def generate(self, prompt: str, format: Optional[str] = None, on_token=None) -> str:
         """
-        Placeholder for NPC extraction using LLM.
-        Currently uses simple pattern matching.
+        Stream a completion from /api/generate and return the full text.
+        on_token, when given, is called with every token as it arrives.
         """
-        if self.enabled:
-            # TODO: Implement actual Ollama API call
-            pass
-        
-        # Simple rule-based extraction for now
-        patterns = [
-            r'\b([A-Z][a-z]+ (?:the )?[A-Z][a-z]+)\b',  # "Thorin the Blacksmith"
-            r'\b([A-Z][a-z]+ [A-Z][a-z]+)\b',           # "John Smith"
-            r'NPC:\s*([A-Za-z\s]+)',                     # "NPC: Character Name"
-        ]
+        if not self.available:
+            raise OllamaUnavailable("Ollama is not configured or recently failed")
         
-        extracted_names = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            extracted_names.extend(matches)
+        payload = {"model": self.model, "prompt": prompt, "stream": True}
+        if format:
+            payload["format"] = format
         
-        # Remove duplicates and common words
-        common_words = {'The Game', 'The Party', 'The Group', 'Game Master', 'Dungeon Master'}
-        return [name.strip() for name in set(extracted_names) if name.strip() not in common_words]
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            raise OllamaUnavailable("Timed out waiting for a free Ollama slot")
+        
+        tokens = []
+        try:
+            async with self.get_client().stream("POST", "/api/generate", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = orjson.loads(line)
+                    if not isinstance(chunk, dict):
+                        raise OllamaUnavailable(f"Unexpected stream chunk: {line[:100]}")
+                    if chunk.get("error"):
+                        raise OllamaUnavailable(chunk["error"])
+                    token = chunk.get("response", "")
+                    if token:
+                        tokens.append(token)
+                        if on_token:
+                            on_token(token)
+                    if chunk.get("done"):
+                        break
+        except (httpx.HTTPError, orjson.JSONDecodeError, OllamaUnavailable) as e:
+            self.unavailable_until = time.monotonic() + self.retry_after_seconds
+            raise OllamaUnavailable(str(e) or type(e).__name__) from e
+        finally:
+            self.semaphore.release()
+        return "".join(tokens)
     
-    async def summarize_interaction(self, interaction_text: str) -> str:
+    def rule_based_npc_names(self, text: str) -> List[str]:
+        """Known NPC names and capitalised phrases, in order of first appearance"""
+        candidates = self.name_matcher.find(text) if self.name_matcher else []
+        for match in NPC_NAME_PATTERN.finditer(text):
+            candidates.append((match.start(), match.group(1) or match.group(2)))
+        # Stable sort keeps known NPC spellings ahead of heuristic ones at the same position
+        candidates.sort(key=lambda candidate: candidate[0])
+        return unique_npc_names(name for _, name in candidates)
+    
+    async def model_npc_names(self, text: str) -> List[str]:
+        """NPC names found by the model; raises OllamaUnavailable or ValueError"""
+        output = await self.generate(NPC_EXTRACTION_PROMPT.format(text=text[:self.max_prompt_chars]), format="json")
+        # orjson.JSONDecodeError is a ValueError
+        parsed = orjson.loads(output)
+        names = parsed.get("npcs", []) if isinstance(parsed, dict) else parsed
+        if not isinstance(names, list):
+            raise ValueError("Unexpected NPC list format")
+        return unique_npc_names(names)
+    
+    async def extract_npcs_from_text(self, text: str) -> List[str]:
         """
-        Placeholder for interaction summarization using LLM.
+        Extract NPC names with the model, falling back to the rule-based matcher.
+        Known NPCs found by the matcher are always listed first.
         """
-        if self.enabled:
-            # TODO: Implement actual Ollama summarization
-            pass
+        if self.available:
+            try:
+                names = await self.model_npc_names(text)
+                known = [name for _, name in self.name_matcher.find(text)] if self.name_matcher else []
+                return unique_npc_names(known + names)
+            except OllamaUnavailable as e:
+                logger.warning(f"Ollama unavailable, using rule-based NPC extraction: {str(e)}")
+            except ValueError as e:
+                logger.warning(f"Unreadable NPC list from Ollama, using rule-based NPC extraction: {str(e)}")
         
-        # Simple summarization for now
+        return self.rule_based_npc_names(text)
+    
+    async def model_summary(self, interaction_text: str) -> str:
+        """One-sentence summary from the model; raises OllamaUnavailable or ValueError"""
+        summary = (await self.generate(SUMMARY_PROMPT.format(text=interaction_text[:self.max_prompt_chars]))).strip()
+        if not summary:
+            raise ValueError("Empty summary")
+        return summary
+    
+    def rule_based_summary(self, interaction_text: str) -> str:
+        # Simple summarization
         if len(interaction_text) > 100:
             return interaction_text[:97] + "..."
         return interaction_text
+    
+    async def summarize_interaction(self, interaction_text: str) -> str:
+        """
+        Summarize an interaction with the model, falling back to truncation.
+        """
+        if self.available:
+            try:
+                return await self.model_summary(interaction_text)
+            except OllamaUnavailable as e:
+                logger.warning(f"Ollama unavailable, using rule-based summary: {str(e)}")
+            except ValueError as e:
+                logger.warning(f"Unusable summary from Ollama, using rule-based summary: {str(e)}")
+        
+        return self.rule_based_summary(interaction_text)
 
 # Initialize LLM service
-llm_service = OllamaLLMService()
+llm_service = OllamaLLMService(
+    name_matcher=npc_name_matcher,
+    base_url=os.environ.get('OLLAMA_URL'),
+    model=os.environ.get('OLLAMA_MODEL', 'llama3'),
+    max_concurrency=int(os.environ.get('OLLAMA_MAX_CONCURRENCY', '2')),
+    timeout_seconds=float(os.environ.get('OLLAMA_TIMEOUT_SECONDS', '60')),
+    queue_timeout_seconds=float(os.environ.get('OLLAMA_QUEUE_TIMEOUT_SECONDS', '30')),
+)
 
 # Helper function to convert session data for MongoDB storage
 def prepare_session_for_storage(session_data: dict) -> dict:
@@ -263,6 +983,797 @@ def prepare_session_for_storage(session_data: dict) -> dict:
                 pass
     return session_data
 
+# Model results are kept this long after they were last used
+LLM_RESULT_TTL_SECONDS = int(os.environ.get('LLM_RESULT_TTL_SECONDS', str(30 * 86400)))
+
+# Request profiles are kept this long
+PROFILE_TTL_SECONDS = int(os.environ.get('PROFILE_TTL_SECONDS', '86400'))
+
+# Index management
+# Indexes the backend relies on. They are created at startup when missing so
+# deployments that never ran mongo-init/init-mongo.js still get indexed queries.
+REQUIRED_INDEXES = {
+    "sessions": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("campaign_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("created_at", DESCENDING)]),
+        IndexModel([("updated_at", DESCENDING)]),
+        IndexModel([("session_type", ASCENDING)]),
+        IndexModel([("structured_data.session_number", ASCENDING)]),
+        IndexModel([("title", TEXT), ("content", TEXT)]),
+    ],
+    "npcs": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("name", ASCENDING)]),
+        IndexModel([("created_at", DESCENDING)]),
+        IndexModel([("status", ASCENDING)]),
+        IndexModel([("name", TEXT), ("background", TEXT), ("notes", TEXT)]),
+    ],
+    "npc_interactions": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("npc_id", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)]),
+        # Campaign export reads every NPC's history in one pass, oldest first
+        IndexModel([("npc_id", ASCENDING), ("timestamp", ASCENDING), ("id", ASCENDING)]),
+        IndexModel([("session_id", ASCENDING)]),
+    ],
+    "campaigns": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("is_active", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("name", ASCENDING)]),
+    ],
+    "llm_results": [
+        IndexModel([("key", ASCENDING)], unique=True),
+        IndexModel([("last_used_at", ASCENDING)], expireAfterSeconds=LLM_RESULT_TTL_SECONDS),
+    ],
+    "profiles": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("created_at", ASCENDING)], expireAfterSeconds=PROFILE_TTL_SECONDS),
+    ],
+    "jobs": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("dedupe_key", ASCENDING)], unique=True, sparse=True),
+        IndexModel([("status", ASCENDING), ("run_after", ASCENDING)]),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+}
+
+def index_signature(key, weights: Optional[dict] = None) -> tuple:
+    """
+    Normalise an index key so declared and existing indexes can be compared.
+    Text indexes are reported by MongoDB as _fts/_ftsx with the fields in weights.
+    """
+    # Existing text indexes report {_fts: "text", _ftsx: 1} as key, so weights must be checked first
+    if weights:
+        return ("text", tuple(sorted(weights)))
+    items = list(key.items()) if isinstance(key, dict) else list(key)
+    if any(direction == TEXT for _, direction in items):
+        return ("text", tuple(sorted(field for field, direction in items if direction == TEXT)))
+    return tuple((field, direction if isinstance(direction, str) else int(direction)) for field, direction in items)
+
+async def ensure_indexes(database) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Create missing REQUIRED_INDEXES, apply changed TTLs and report drift.
+    Returns, per collection, the indexes created, the TTL indexes whose
+    expireAfterSeconds was changed to the configured value with collMod, the
+    declared indexes whose other options differ from the existing ones, and
+    existing indexes that are not declared.
+    """
+    report = {}
+    for collection_name, declared in REQUIRED_INDEXES.items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        existing_by_signature = {
+            index_signature(info["key"], info.get("weights")): (name, info)
+            for name, info in existing.items() if name != "_id_"
+        }
+        
+        missing = []
+        ttl_changes = {}
+        drift = []
+        declared_signatures = set()
+        for index in declared:
+            document = index.document
+            signature = index_signature(document["key"])
+            declared_signatures.add(signature)
+            if signature not in existing_by_signature:
+                missing.append(index)
+                continue
+            name, info = existing_by_signature[signature]
+            for option in ("unique", "sparse"):
+                if bool(info.get(option, False)) != bool(document.get(option, False)):
+                    drift.append(f"{name} ({option}={bool(info.get(option, False))}, expected {option}={bool(document.get(option, False))})")
+            existing_ttl = info.get("expireAfterSeconds")
+            declared_ttl = document.get("expireAfterSeconds")
+            if existing_ttl is not None and declared_ttl is not None:
+                if int(existing_ttl) != declared_ttl:
+                    ttl_changes[name] = declared_ttl
+            elif existing_ttl != declared_ttl:
+                # Adding or removing a TTL is not possible with collMod
+                drift.append(f"{name} (expireAfterSeconds={existing_ttl}, expected expireAfterSeconds={declared_ttl})")
+        
+        created = []
+        # One at a time, so an index that cannot be built (e.g. a second text index)
+        # does not keep the others from being created
+        for index in missing:
+            try:
+                created += await collection.create_indexes([index])
+            except PyMongoError as e:
+                logger.error(f"Error creating index {collection_name}.{index.document['name']}: {str(e)}")
+        
+        ttl_updated = []
+        for name, ttl in ttl_changes.items():
+            try:
+                await database.command("collMod", collection_name, index={"name": name, "expireAfterSeconds": ttl})
+                ttl_updated.append(name)
+            except PyMongoError as e:
+                logger.error(f"Error changing the TTL of {collection_name}.{name}: {str(e)}")
+                drift.append(f"{name} (expireAfterSeconds differs, expected expireAfterSeconds={ttl})")
+        
+        undeclared = [name for signature, (name, _) in existing_by_signature.items() if signature not in declared_signatures]
+        
+        for name in created:
+            logger.info(f"Created index {collection_name}.{name}")
+        for name in ttl_updated:
+            logger.info(f"Changed TTL of {collection_name}.{name} to {ttl_changes[name]}s")
+        for entry in drift:
+            logger.warning(f"Index drift on {collection_name}: {entry}")
+        for name in undeclared:
+            logger.warning(f"Undeclared index on {collection_name}: {name}")
+        
+        report[collection_name] = {"created": created, "ttl_updated": ttl_updated, "drift": drift, "undeclared": undeclared}
+    return report
+
+# Read cache
+# Key whose shared version is bumped by clear(), invalidating every key at once
+READ_CACHE_ALL_KEYS = "*"
+
+class ReadCache:
+    """
+    Bounded in-process LRU cache with a TTL for rarely changing reads.
+    Write handlers invalidate the keys they affect. With several worker processes
+    each has its own cache, so share() makes invalidation cross-process: writes
+    bump a per-key version in MongoDB and a cached value is only served while the
+    version it was loaded under is still current (one _id lookup per cached read).
+    """
+    
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Bumped on every invalidation so reads that started before a write
+        # do not store the value they loaded after it
+        self.generation = 0
+        self.versions = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def share(self, versions):
+        """Check and bump versions in the given collection so all workers see each other's writes"""
+        self.versions = versions
+        self.clear()
+    
+    async def shared_version(self, key: str) -> tuple:
+        if self.versions is None:
+            return ()
+        documents = await self.versions.find({"_id": {"$in": [key, READ_CACHE_ALL_KEYS]}}).to_list(2)
+        found = {document["_id"]: document["version"] for document in documents}
+        return found.get(key, 0), found.get(READ_CACHE_ALL_KEYS, 0)
+    
+    async def get_or_load(self, key: str, load):
+        """
+        Return the cached value for key, or await load() and cache its result unless it is None.
+        The shared version is read before loading, so a write that lands during the load
+        leaves the stored value already out of date for every worker.
+        """
+        version = await self.shared_version(key)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] >= time.monotonic() and entry[2] == version:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self.entries[key]
+        self.misses += 1
+        
+        generation = self.generation
+        value = await load()
+        if value is not None:
+            self.set(key, value, generation, version)
+        return value
+    
+    def set(self, key: str, value, generation: int, version: tuple = ()):
+        if self.ttl_seconds <= 0 or generation != self.generation:
+            return
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, value, version)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    async def bump(self, keys: List[str]):
+        if self.versions is not None:
+            await self.versions.bulk_write(
+                [UpdateOne({"_id": key}, {"$inc": {"version": 1}}, upsert=True) for key in keys], ordered=False
+            )
+    
+    async def invalidate(self, *keys: str):
+        self.generation += 1
+        for key in keys:
+            if self.entries.pop(key, None) is not None:
+                self.invalidations += 1
+        await self.bump(list(keys))
+    
+    def clear(self):
+        self.generation += 1
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+    
+    async def clear_all(self):
+        """Drop every cached value in every worker"""
+        self.clear()
+        await self.bump([READ_CACHE_ALL_KEYS])
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "shared": self.versions is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+read_cache = ReadCache(
+    max_entries=int(os.environ.get('READ_CACHE_MAX_ENTRIES', '256')),
+    ttl_seconds=float(os.environ.get('READ_CACHE_TTL_SECONDS', '30')),
+)
+# Set by serve.py when it starts several workers
+READ_CACHE_SHARED = os.environ.get('READ_CACHE_SHARED', '').lower() in ('1', 'true', 'yes')
+
+ACTIVE_CAMPAIGNS_CACHE_KEY = "campaigns:active"
+NPCS_CACHE_KEY = "npcs:all"
+
+def campaign_cache_key(campaign_id: str) -> str:
+    return f"campaign:{campaign_id}"
+
+async def invalidate_campaign_cache(campaign_id: Optional[str] = None):
+    """Drop the cached campaign list and, when given, one cached campaign"""
+    keys = [ACTIVE_CAMPAIGNS_CACHE_KEY]
+    if campaign_id:
+        keys.append(campaign_cache_key(campaign_id))
+    await read_cache.invalidate(*keys)
+
+# Conditional GET helpers
+# Weak ETags are derived from id/updated_at so a matching If-None-Match can be
+# answered with 304 before any Pydantic model is built.
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+def document_etag(document: dict) -> str:
+    return make_etag(document.get("id"), document.get("updated_at"))
+
+def list_etag(documents: list, *variant) -> str:
+    """
+    ETag over every item's (id, updated_at), so removing or replacing any item changes it.
+    variant names the representation (view, page) so different responses never share a tag.
+    """
+    digest = hashlib.sha1()
+    for document in documents:
+        digest.update(f"{document.get('id')}:{document.get('updated_at')};".encode())
+    return make_etag(*variant, digest.hexdigest())
+
+def etag_headers(etag: str) -> dict:
+    # Responses depend on the Basic auth user, so only private caches may keep them
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of the request's If-None-Match against etag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque_tag for candidate in if_none_match.split(","))
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+# Fast read serialization
+# Documents read back from MongoDB were validated when they were written, so list
+# endpoints shape them like the response model and encode them with orjson instead
+# of building a model per item and validating it again through response_model.
+def trusted_document(document: dict, model) -> dict:
+    """Shape a stored document like model(**document).dict() without validating it"""
+    return {
+        name: document[name] if name in document else field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+    }
+
+def trusted_list_response(documents: List[dict], model, headers: Optional[dict] = None) -> ORJSONResponse:
+    return ORJSONResponse(content=[trusted_document(document, model) for document in documents], headers=headers)
+
+# Keyset pagination helpers
+SESSION_PAGE_SIZE = 1000
+NPC_HISTORY_PAGE_SIZE = 100
+
+def encode_keyset_cursor(sort_value: datetime, doc_id: str) -> str:
+    """Encode a (sort value, id) position as an opaque cursor"""
+    payload = json.dumps({"after": sort_value, "id": doc_id}, default=json_serializer)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_keyset_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by encode_keyset_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["after"]), str(payload["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def fetch_keyset_page(collection, query: dict, sort_field: str, limit: int, cursor: Optional[str] = None, projection: Optional[dict] = None):
+    """
+    Fetch one page of documents ordered by (sort_field, id) descending.
+    Uses keyset pagination so every page costs the same regardless of depth.
+    Returns the documents and the cursor for the next page (None on the last page).
+    """
+    if cursor:
+        sort_value, last_id = decode_keyset_cursor(cursor)
+        query = {"$and": [query, {"$or": [
+            {sort_field: {"$lt": sort_value}},
+            {sort_field: sort_value, "id": {"$lt": last_id}},
+        ]}]}
+    
+    documents = await collection.find(query, projection).sort([(sort_field, -1), ("id", -1)]).limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_keyset_cursor(documents[-1][sort_field], documents[-1]["id"])
+    return documents, next_cursor
+
+async def fetch_session_page(query: dict, limit: int, cursor: Optional[str] = None, projection: Optional[dict] = None):
+    """Fetch one page of sessions ordered by (created_at, id) descending"""
+    return await fetch_keyset_page(db.sessions, query, "created_at", limit, cursor, projection)
+
+# Only the fields needed by SessionSummary are read from MongoDB
+SESSION_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "title": 1,
+    "campaign_id": 1,
+    "structured_data.session_number": 1,
+    "structured_data.session_date": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+def session_summary_from_doc(session: dict) -> SessionSummary:
+    """Build a SessionSummary from a document read with SESSION_SUMMARY_PROJECTION"""
+    structured_data = session.get("structured_data") or {}
+    return SessionSummary(
+        id=session["id"],
+        title=session["title"],
+        campaign_id=session.get("campaign_id", ""),
+        session_number=structured_data.get("session_number"),
+        session_date=structured_data.get("session_date"),
+        created_at=session["created_at"],
+        updated_at=session.get("updated_at", session["created_at"]),
+    )
+
+async def list_sessions(query: dict, request: Request, limit: int, cursor: Optional[str], view: str):
+    """Shared implementation of the session list endpoints for both views"""
+    projection = SESSION_SUMMARY_PROJECTION if view == "summary" else None
+    sessions, next_cursor = await fetch_session_page(query, limit, cursor, projection)
+    
+    headers = etag_headers(list_etag(sessions, view, limit, cursor))
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    
+    if view == "summary":
+        summaries = [session_summary_from_doc(session).dict() for session in sessions]
+        return ORJSONResponse(content=summaries, headers=headers)
+    return trusted_list_response(sessions, Session, headers)
+
+# NPC interaction helpers
+# Only this many of the latest interactions are kept on the NPC document itself
+NPC_RECENT_HISTORY = 5
+
+def npc_history_entry(interaction: NPCInteraction) -> dict:
+    return {
+        "session_id": interaction.session_id,
+        "interaction": interaction.interaction,
+        "timestamp": interaction.timestamp
+    }
+
+def npc_interaction_update(interaction: NPCInteraction) -> dict:
+    """Update recording an interaction on the NPC: bounded recent slice plus a counter"""
+    return {
+        "$push": {"history": {"$each": [npc_history_entry(interaction)], "$slice": -NPC_RECENT_HISTORY}},
+        "$inc": {"interaction_count": 1},
+        "$set": {"updated_at": interaction.timestamp},
+    }
+
+def npc_interaction_upsert(npc_name: str, session_id: str, extracted_text: str, timestamp: datetime) -> tuple:
+    """
+    Build the upsert that records an interaction on the NPC with this name,
+    creating the NPC when it does not exist yet.
+    Returns the NPC that would be created, the interaction and the update document.
+    """
+    new_npc = NPC(name=npc_name, notes=f"First mentioned: {extracted_text}", created_at=timestamp, updated_at=timestamp)
+    interaction = NPCInteraction(npc_id=new_npc.id, session_id=session_id, interaction=extracted_text, timestamp=timestamp)
+    update = npc_interaction_update(interaction)
+    # Fields only written when the upsert creates the NPC
+    update["$setOnInsert"] = new_npc.dict(exclude={"history", "interaction_count", "updated_at"})
+    return new_npc, interaction, update
+
+async def migrate_npc_history(database) -> int:
+    """
+    Move embedded NPC history into npc_interactions.
+    Interaction ids are derived from the NPC id and position and written with upserts, so
+    the migration can be re-run, and run by several workers at once, without duplicates.
+    Returns the number of NPCs migrated.
+    """
+    migrated = 0
+    cursor = database.npcs.find({"interaction_count": {"$exists": False}}, {"_id": 0, "id": 1, "history": 1})
+    async for npc in cursor:
+        history = npc.get("history") or []
+        operations = []
+        for index, entry in enumerate(history):
+            interaction = NPCInteraction(
+                id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"npc-history:{npc['id']}:{index}")),
+                npc_id=npc["id"],
+                session_id=entry.get("session_id", ""),
+                interaction=entry.get("interaction", ""),
+                timestamp=entry.get("timestamp") or datetime.utcnow()
+            )
+            operations.append(UpdateOne({"id": interaction.id}, {"$setOnInsert": interaction.dict()}, upsert=True))
+        if operations:
+            await database.npc_interactions.bulk_write(operations, ordered=False)
+        result = await database.npcs.update_one(
+            {"id": npc["id"], "interaction_count": {"$exists": False}},
+            {"$set": {"history": history[-NPC_RECENT_HISTORY:], "interaction_count": len(history)}}
+        )
+        if result.matched_count == 0:
+            # Another worker migrated this NPC, or an extraction recorded an interaction
+            # after it was read: keep that newer history and count every stored interaction
+            count = await database.npc_interactions.count_documents({"npc_id": npc["id"]})
+            await database.npcs.update_one({"id": npc["id"]}, {"$max": {"interaction_count": count}})
+            continue
+        migrated += 1
+    return migrated
+
+# Search helpers
+SEARCH_SNIPPET_LENGTH = 160
+
+def search_term_pattern(query: str) -> Optional[re.Pattern]:
+    """
+    Compile one pattern matching any positive term of a $text query.
+    Terms match as word prefixes to roughly follow MongoDB's stemming.
+    """
+    terms = [t.strip('"').lower() for t in re.findall(r'"[^"]+"|\S+', query) if not t.startswith("-")]
+    terms = [t for t in terms if t]
+    if not terms:
+        return None
+    alternatives = "|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternatives})\w*", re.IGNORECASE)
+
+def build_snippet(text: str, pattern: Optional[re.Pattern]) -> tuple:
+    """Cut a snippet around the first match in text and return it with the match offsets"""
+    first = pattern.search(text) if pattern else None
+    if not first:
+        snippet = text[:SEARCH_SNIPPET_LENGTH]
+        return (snippet + "...") if len(text) > SEARCH_SNIPPET_LENGTH else snippet, []
+    
+    start = max(0, first.start() - SEARCH_SNIPPET_LENGTH // 4)
+    end = min(len(text), start + SEARCH_SNIPPET_LENGTH)
+    prefix = "..." if start > 0 else ""
+    suffix = "..." if end < len(text) else ""
+    snippet = prefix + text[start:end] + suffix
+    highlights = [[m.start(), m.end()] for m in pattern.finditer(snippet)]
+    return snippet, highlights
+
+def search_hit_from_doc(hit_type: str, doc: dict, title_field: str, text_fields: List[str], pattern: Optional[re.Pattern]) -> SearchHit:
+    """Build a SearchHit, taking the snippet from the first text field that matches"""
+    candidates = [(field, doc.get(field) or "") for field in text_fields]
+    field, text = next(
+        ((f, t) for f, t in candidates if pattern and pattern.search(t)),
+        next(((f, t) for f, t in candidates if t), ("", ""))
+    )
+    snippet, highlights = build_snippet(text, pattern)
+    return SearchHit(
+        type=hit_type,
+        id=doc["id"],
+        title=doc.get(title_field, ""),
+        campaign_id=doc.get("campaign_id"),
+        score=doc.get("score", 0.0),
+        field=field,
+        snippet=snippet,
+        highlights=highlights,
+    )
+
+# Model result memoisation
+# Session text is re-submitted with most paragraphs unchanged, so model output is
+# stored per normalised paragraph in llm_results and only new paragraphs reach the model.
+# Entries expire LLM_RESULT_TTL_SECONDS after they were last used (TTL index on
+# last_used_at), which is refreshed at most once per LLM_RESULT_TOUCH_SECONDS.
+# Rule-based fallbacks are cheap and are never stored.
+LLM_RESULT_TOUCH_SECONDS = 3600
+
+def split_paragraphs(text: str) -> List[str]:
+    """Non-empty paragraphs with whitespace collapsed, in order"""
+    paragraphs = (" ".join(block.split()) for block in re.split(r"\n\s*\n", text))
+    return [paragraph for paragraph in paragraphs if paragraph]
+
+class LLMResultCache:
+    """Persistent model results keyed by a hash of kind, model and normalised text"""
+    
+    def __init__(self, collection_name: str = "llm_results"):
+        self.collection_name = collection_name
+        self.hits = 0
+        self.misses = 0
+    
+    def key(self, kind: str, model: str, text: str) -> str:
+        return hashlib.sha256(f"{kind}\0{model}\0{text}".encode("utf-8")).hexdigest()
+    
+    async def get_many(self, database, keys: List[str]) -> Dict[str, Any]:
+        collection = database[self.collection_name]
+        documents = await collection.find({"key": {"$in": keys}}, {"_id": 0, "key": 1, "value": 1, "last_used_at": 1}).to_list(None)
+        now = datetime.utcnow()
+        stale = [doc["key"] for doc in documents if doc["last_used_at"] < now - timedelta(seconds=LLM_RESULT_TOUCH_SECONDS)]
+        if stale:
+            await collection.update_many({"key": {"$in": stale}}, {"$set": {"last_used_at": now}})
+        found = {doc["key"]: doc["value"] for doc in documents}
+        self.hits += len(found)
+        self.misses += len(set(keys)) - len(found)
+        return found
+    
+    async def set_many(self, database, kind: str, values: Dict[str, Any]):
+        if not values:
+            return
+        now = datetime.utcnow()
+        await database[self.collection_name].bulk_write([
+            UpdateOne({"key": key}, {"$set": {"value": value, "last_used_at": now},
+                                     "$setOnInsert": {"kind": kind, "created_at": now}}, upsert=True)
+            for key, value in values.items()
+        ], ordered=False)
+    
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+llm_result_cache = LLMResultCache()
+
+async def memoised_model_results(kind: str, texts: List[str], compute) -> List[Optional[Any]]:
+    """
+    Model results for texts, computing only those not stored yet.
+    A text whose computation fails gets None so the caller can fall back.
+    """
+    keys = [llm_result_cache.key(kind, llm_service.model, text) for text in texts]
+    try:
+        found = await llm_result_cache.get_many(db, keys)
+    except PyMongoError as e:
+        logger.error(f"Error reading model results: {str(e)}")
+        found = {}
+    
+    missing = {key: text for key, text in zip(keys, texts) if key not in found}
+    
+    async def run(text):
+        try:
+            return await compute(text)
+        except OllamaUnavailable as e:
+            logger.warning(f"Ollama unavailable for {kind}: {str(e)}")
+        except ValueError as e:
+            logger.warning(f"Unusable {kind} result from Ollama: {str(e)}")
+        return None
+    
+    # The service semaphore bounds how many of these reach Ollama at once
+    computed = await asyncio.gather(*(run(text) for text in missing.values()))
+    new_values = {key: value for key, value in zip(missing, computed) if value is not None}
+    try:
+        await llm_result_cache.set_many(db, kind, new_values)
+    except PyMongoError as e:
+        logger.error(f"Error storing model results: {str(e)}")
+    found.update(new_values)
+    return [found.get(key) for key in keys]
+
+# Background jobs
+# Jobs live in the jobs collection, so queued work survives a restart and any
+# backend process can pick it up. Workers claim a job by atomically moving it to
+# "running" with a lease; a job whose lease expired (its worker died) is claimed again.
+# While a job is queued, running or completed its dedupe_key holds the content hash,
+# so submitting the same work returns the existing job instead of a new one.
+JOB_RESULT_TTL_SECONDS = int(os.environ.get('JOB_RESULT_TTL_SECONDS', '86400'))
+
+def job_content_hash(job_type: str, payload: dict) -> str:
+    return hashlib.sha256(job_type.encode("utf-8") + b"\0" + orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+class JobQueue:
+    """Worker pool running jobs stored in MongoDB"""
+    
+    def __init__(
+        self,
+        handlers: Dict[str, Any],
+        workers: int = 2,
+        max_attempts: int = 3,
+        retry_delay_seconds: float = 5.0,
+        lease_seconds: float = 300.0,
+        poll_interval_seconds: float = 2.0,
+        result_ttl_seconds: int = JOB_RESULT_TTL_SECONDS,
+    ):
+        self.handlers = handlers
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay_seconds = retry_delay_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.result_ttl_seconds = result_ttl_seconds
+        self.database = None
+        self.tasks: List[asyncio.Task] = []
+        self.running_ids = set()
+        self.wakeup = asyncio.Event()
+    
+    def start(self, database):
+        self.database = database
+        self.tasks = [asyncio.create_task(self.work()) for _ in range(self.workers)]
+    
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        if self.running_ids:
+            # Hand interrupted jobs back to the queue instead of waiting for their lease to expire
+            await self.database.jobs.update_many(
+                {"id": {"$in": list(self.running_ids)}, "status": "running"},
+                {"$set": {"status": "queued", "run_after": datetime.utcnow(), "locked_until": None},
+                 "$inc": {"attempts": -1}}
+            )
+            self.running_ids.clear()
+    
+    async def submit(self, database, job_type: str, payload: dict) -> dict:
+        """Queue a job, or return the existing job for the same type and payload"""
+        now = datetime.utcnow()
+        content_hash = job_content_hash(job_type, payload)
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": job_type,
+            "payload": payload,
+            "content_hash": content_hash,
+            "status": "queued",
+            "attempts": 0,
+            "result": None,
+            "error": None,
+            "run_after": now,
+            "locked_until": None,
+            "created_at": now,
+            "updated_at": now,
+            "finished_at": None,
+            "expires_at": None,
+        }
+        try:
+            stored = await database.jobs.find_one_and_update(
+                {"dedupe_key": content_hash},
+                {"$setOnInsert": job},
+                projection={"_id": 0, "payload": 0},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # A concurrent submit of the same content won the upsert
+            stored = await database.jobs.find_one({"dedupe_key": content_hash}, {"_id": 0, "payload": 0})
+        self.wakeup.set()
+        return stored
+    
+    async def claim(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        return await self.database.jobs.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "run_after": {"$lte": now}},
+                {"status": "running", "locked_until": {"$lt": now}},
+            ]},
+            {"$set": {"status": "running", "locked_until": now + timedelta(seconds=self.lease_seconds),
+                      "updated_at": now},
+             "$inc": {"attempts": 1}},
+            projection={"_id": 0},
+            sort=[("run_after", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+    
+    async def finish(self, job: dict, update: dict, unset: Optional[dict] = None):
+        change = {"$set": update}
+        if unset:
+            change["$unset"] = unset
+        await self.database.jobs.update_one({"id": job["id"], "status": "running"}, change)
+    
+    async def run(self, job: dict):
+        handler = self.handlers.get(job["type"])
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job type: {job['type']}")
+            result = await handler(job["payload"])
+        except Exception as e:
+            logger.error(f"Error running job {job['id']} ({job['type']}), attempt {job['attempts']}: {str(e)}")
+            now = datetime.utcnow()
+            if handler is not None and job["attempts"] < self.max_attempts:
+                delay = self.retry_delay_seconds * 2 ** (job["attempts"] - 1)
+                await self.finish(job, {"status": "queued", "error": str(e), "locked_until": None, "updated_at": now,
+                                        "run_after": now + timedelta(seconds=delay)})
+            else:
+                # Failed jobs stop deduplicating so the same work can be submitted again
+                await self.finish(job, {"status": "failed", "error": str(e), "updated_at": now, "finished_at": now,
+                                        "expires_at": now + timedelta(seconds=self.result_ttl_seconds)},
+                                  unset={"dedupe_key": ""})
+            return
+        now = datetime.utcnow()
+        await self.finish(job, {"status": "completed", "result": result, "error": None, "updated_at": now,
+                                "finished_at": now, "expires_at": now + timedelta(seconds=self.result_ttl_seconds)})
+    
+    async def work(self):
+        while True:
+            try:
+                job = await self.claim()
+            except PyMongoError as e:
+                logger.error(f"Error claiming job: {str(e)}")
+                job = None
+            if job is None:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.running_ids.add(job["id"])
+            try:
+                await self.run(job)
+            except PyMongoError as e:
+                logger.error(f"Error recording result of job {job['id']}: {str(e)}")
+            finally:
+                self.running_ids.discard(job["id"])
+
+async def suggest_npc_names(text: str) -> dict:
+    """
+    Known NPCs found in the text followed by the names the model finds paragraph by paragraph.
+    Without a reachable model the rule-based extraction runs over the whole text.
+    """
+    await npc_name_matcher.ensure_loaded(db)
+    if llm_service.available:
+        paragraphs = split_paragraphs(text)
+        results = await memoised_model_results("npcs", paragraphs, llm_service.model_npc_names)
+        names = [name for _, name in npc_name_matcher.find(text)]
+        for paragraph, paragraph_names in zip(paragraphs, results):
+            names.extend(llm_service.rule_based_npc_names(paragraph) if paragraph_names is None else paragraph_names)
+        suggested_names = unique_npc_names(names)
+    else:
+        suggested_names = await llm_service.extract_npcs_from_text(text)
+    known_names = [name for name in suggested_names if npc_name_matcher.is_known(name)]
+    return {"suggested_npcs": suggested_names, "known_npcs": known_names}
+
+async def summarize_text(text: str) -> str:
+    if llm_service.available:
+        [summary] = await memoised_model_results("summary", [" ".join(text.split())], llm_service.model_summary)
+        if summary is not None:
+            return summary
+    return llm_service.rule_based_summary(text)
+
+async def run_suggest_npcs_job(payload: dict) -> dict:
+    return await suggest_npc_names(payload["text"])
+
+async def run_summarize_interaction_job(payload: dict) -> dict:
+    return {"summary": await summarize_text(payload["text"])}
+
+job_queue = JobQueue(
+    {"suggest_npcs": run_suggest_npcs_job, "summarize_interaction": run_summarize_interaction_job},
+    workers=int(os.environ.get('JOB_WORKERS', '2')),
+    max_attempts=int(os.environ.get('JOB_MAX_ATTEMPTS', '3')),
+)
+
 # API Routes
 @api_router.get("/")
 async def root():
@@ -290,19 +1801,32 @@ async def create_session(session_data: SessionCreate, username: str = Depends(au
         raise HTTPException(status_code=500, detail=f"Error creating session: {str(e)}")
 
 @api_router.get("/sessions", response_model=List[Session])
-async def get_sessions(campaign_id: Optional[str] = None, username: str = Depends(authenticate)):
-    """Get sessions, optionally filtered by campaign"""
-    if campaign_id:
-        sessions = await db.sessions.find({"campaign_id": campaign_id}).sort("created_at", -1).to_list(1000)
-    else:
-        sessions = await db.sessions.find().sort("created_at", -1).to_list(1000)
-    return [Session(**session) for session in sessions]
+async def get_sessions(
+    request: Request,
+    campaign_id: Optional[str] = None,
+    limit: int = Query(SESSION_PAGE_SIZE, ge=1, le=SESSION_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    username: str = Depends(authenticate)
+):
+    """
+    Get sessions, optionally filtered by campaign.
+    view=summary returns SessionSummary items instead of full sessions.
+    The next page cursor is returned in X-Next-Cursor.
+    """
+    query = {"campaign_id": campaign_id} if campaign_id else {}
+    return await list_sessions(query, request, limit, cursor, view)
 
 @api_router.get("/sessions/{session_id}", response_model=Session)
-async def get_session(session_id: str, username: str = Depends(authenticate)):
+async def get_session(session_id: str, request: Request, response: Response, username: str = Depends(authenticate)):
     session = await db.sessions.find_one({"id": session_id})
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
+    
+    headers = etag_headers(document_etag(session))
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
     return Session(**session)
 
 @api_router.put("/sessions/{session_id}", response_model=Session)
@@ -312,16 +1836,19 @@ async def update_session(session_id: str, session_data: SessionUpdate, username:
         update_data = prepare_session_for_storage(update_data)
         update_data["updated_at"] = datetime.utcnow()
         
-        result = await db.sessions.update_one(
+        updated_session = await db.sessions.find_one_and_update(
             {"id": session_id}, 
-            {"$set": update_data}
+            {"$set": update_data},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if not updated_session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        updated_session = await db.sessions.find_one({"id": session_id})
         return Session(**updated_session)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating session: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error updating session: {str(e)}")
@@ -333,6 +1860,98 @@ async def delete_session(session_id: str, username: str = Depends(authenticate))
         raise HTTPException(status_code=404, detail="Session not found")
     return {"message": "Session deleted successfully"}
 
+# Structured data patch route
+STRUCTURED_DATA_SECTIONS = {
+    "combat_encounters": CombatEncounter,
+    "roleplay_encounters": RoleplayEncounter,
+    "npcs_encountered": NPCMention,
+    "loot": LootItem,
+    "overarching_missions": OverarchingMission,
+}
+
+def structured_data_update(session_id: str, operation: StructuredDataOperation, now: datetime) -> tuple:
+    """Translate one patch operation into an UpdateOne; returns it with the affected item id"""
+    model = STRUCTURED_DATA_SECTIONS[operation.section]
+    path = f"structured_data.{operation.section}"
+    
+    fields = {k: v for k, v in operation.item.items() if k != "id"}
+    unknown = set(fields) - set(model.model_fields)
+    if unknown and operation.op != "remove":
+        raise HTTPException(status_code=400, detail=f"Unknown fields for {operation.section}: {', '.join(sorted(unknown))}")
+    
+    if operation.op == "add":
+        item = model(**operation.item)
+        return UpdateOne({"id": session_id}, {"$push": {path: item.dict()}, "$set": {"updated_at": now}}), item.id
+    
+    if not operation.item_id:
+        raise HTTPException(status_code=400, detail=f"item_id is required for {operation.op}")
+    item_filter = {"id": session_id, f"{path}.id": operation.item_id}
+    
+    if operation.op == "remove":
+        return UpdateOne(item_filter, {"$pull": {path: {"id": operation.item_id}}, "$set": {"updated_at": now}}), operation.item_id
+    
+    if not fields:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    # All item fields have defaults, so validating just the changed ones checks their types
+    validated = model(**fields).dict(include=set(fields))
+    update = {f"{path}.$[item].{k}": v for k, v in validated.items()}
+    update["updated_at"] = now
+    return UpdateOne(item_filter, {"$set": update}, array_filters=[{"item.id": operation.item_id}]), operation.item_id
+
+@api_router.patch("/sessions/{session_id}/structured-data")
+async def patch_structured_data(session_id: str, patch: StructuredDataPatch, username: str = Depends(authenticate)):
+    """
+    Add, update or remove individual structured data items by id without resending the session.
+    Operations are applied in order in a single bulk_write.
+    """
+    now = datetime.utcnow()
+    try:
+        updates = [structured_data_update(session_id, operation, now) for operation in patch.operations]
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid item: {str(e)}")
+    
+    operations = [update for update, _ in updates]
+    has_add = any(operation.op == "add" for operation in patch.operations)
+    if has_add:
+        # Free-form sessions have no structured_data to push into yet
+        operations.insert(0, UpdateOne(
+            {"id": session_id},
+            [{"$set": {"structured_data": {"$ifNull": ["$structured_data", SessionStructuredData().dict()]}}}]
+        ))
+    
+    try:
+        result = await db.sessions.bulk_write(operations, ordered=True)
+    except PyMongoError as e:
+        logger.error(f"Error patching session: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error patching session: {str(e)}")
+    
+    applied = result.matched_count - (1 if has_add else 0)
+    if result.matched_count == 0 and not await db.sessions.find_one({"id": session_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    not_found = []
+    if applied < len(patch.operations):
+        # Only read the session back when some update or remove did not find its item
+        session = await db.sessions.find_one(
+            {"id": session_id}, {"_id": 0, **{f"structured_data.{section}.id": 1 for section in STRUCTURED_DATA_SECTIONS}}
+        ) or {}
+        structured_data = session.get("structured_data") or {}
+        removed = {item_id for operation, (_, item_id) in zip(patch.operations, updates) if operation.op == "remove"}
+        for operation, (_, item_id) in zip(patch.operations, updates):
+            # Removing a missing item is a no-op, so only updates are reported
+            if operation.op != "update" or item_id in removed:
+                continue
+            if not any(item.get("id") == item_id for item in structured_data.get(operation.section, [])):
+                not_found.append(item_id)
+    
+    return {
+        "session_id": session_id,
+        "updated_at": now,
+        "applied": applied,
+        "item_ids": [item_id for _, item_id in updates],
+        "not_found": not_found
+    }
+
 # Session template route
 @api_router.get("/sessions/template/structured")
 async def get_structured_template(username: str = Depends(authenticate)):
@@ -369,18 +1988,31 @@ async def create_npc(npc_data: NPCCreate, username: str = Depends(authenticate))
     npc_dict = npc_data.dict()
     npc_obj = NPC(**npc_dict)
     await db.npcs.insert_one(npc_obj.dict())
+    await read_cache.invalidate(NPCS_CACHE_KEY)
+    npc_name_matcher.set(npc_obj.id, npc_obj.name)
     return npc_obj
 
 @api_router.get("/npcs", response_model=List[NPC])
-async def get_npcs(username: str = Depends(authenticate)):
-    npcs = await db.npcs.find().sort("name", 1).to_list(1000)
-    return [NPC(**npc) for npc in npcs]
+async def get_npcs(request: Request, username: str = Depends(authenticate)):
+    npcs = await read_cache.get_or_load(
+        NPCS_CACHE_KEY, lambda: db.npcs.find({}, {"_id": 0}).sort("name", 1).to_list(1000)
+    )
+    
+    headers = etag_headers(list_etag(npcs))
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    return trusted_list_response(npcs, NPC, headers)
 
 @api_router.get("/npcs/{npc_id}", response_model=NPC)
-async def get_npc(npc_id: str, username: str = Depends(authenticate)):
+async def get_npc(npc_id: str, request: Request, response: Response, username: str = Depends(authenticate)):
     npc = await db.npcs.find_one({"id": npc_id})
     if not npc:
         raise HTTPException(status_code=404, detail="NPC not found")
+    
+    headers = etag_headers(document_etag(npc))
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
     return NPC(**npc)
 
 @api_router.put("/npcs/{npc_id}", response_model=NPC)
@@ -388,15 +2020,19 @@ async def update_npc(npc_id: str, npc_data: NPCUpdate, username: str = Depends(a
     update_data = {k: v for k, v in npc_data.dict().items() if v is not None}
     update_data["updated_at"] = datetime.utcnow()
     
-    result = await db.npcs.update_one(
+    updated_npc = await db.npcs.find_one_and_update(
         {"id": npc_id}, 
-        {"$set": update_data}
+        {"$set": update_data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.matched_count == 0:
+    if not updated_npc:
         raise HTTPException(status_code=404, detail="NPC not found")
+    await read_cache.invalidate(NPCS_CACHE_KEY)
+    if "name" in update_data:
+        npc_name_matcher.set(npc_id, update_data["name"])
     
-    updated_npc = await db.npcs.find_one({"id": npc_id})
     return NPC(**updated_npc)
 
 @api_router.delete("/npcs/{npc_id}")
@@ -404,50 +2040,197 @@ async def delete_npc(npc_id: str, username: str = Depends(authenticate)):
     result = await db.npcs.delete_one({"id": npc_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="NPC not found")
+    await db.npc_interactions.delete_many({"npc_id": npc_id})
+    await read_cache.invalidate(NPCS_CACHE_KEY)
+    npc_name_matcher.discard(npc_id)
     return {"message": "NPC deleted successfully"}
 
 # NPC extraction route
 @api_router.post("/extract-npc")
 async def extract_npc(extraction_data: NPCExtraction, username: str = Depends(authenticate)):
-    # Check if NPC already exists
-    existing_npc = await db.npcs.find_one({"name": extraction_data.npc_name})
-    
-    if existing_npc:
-        # Add interaction to existing NPC
-        interaction_entry = {
-            "session_id": extraction_data.session_id,
-            "interaction": extraction_data.extracted_text,
-            "timestamp": datetime.utcnow()
-        }
-        
-        await db.npcs.update_one(
-            {"name": extraction_data.npc_name},
-            {"$push": {"history": interaction_entry}, "$set": {"updated_at": datetime.utcnow()}}
-        )
+    # Record the interaction on the NPC, creating it if it does not exist yet
+    new_npc, interaction, update = npc_interaction_upsert(
+        extraction_data.npc_name, extraction_data.session_id, extraction_data.extracted_text, datetime.utcnow()
+    )
+    npc = await db.npcs.find_one_and_update(
+        {"name": extraction_data.npc_name},
+        update,
+        projection={"_id": 0},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    created = npc["id"] == new_npc.id
+    
+    interaction.npc_id = npc["id"]
+    await db.npc_interactions.insert_one(interaction.dict())
+    await read_cache.invalidate(NPCS_CACHE_KEY)
+    
+    if created:
+        npc_name_matcher.set(npc["id"], npc["name"])
+        return {"action": "created", "npc": NPC(**npc)}
+    return {"action": "updated", "npc": NPC(**npc)}
+
+@api_router.post("/extract-npcs")
+async def extract_npcs_bulk(extraction_data: NPCBulkExtraction, username: str = Depends(authenticate)):
+    """
+    Tag many NPCs from one session at once.
+    All NPC upserts go out in a single bulk_write. Ids of created NPCs come from its
+    upserted_ids; one read resolves the ids of NPCs that already existed (skipped when
+    every NPC is new), and all interactions go out in a single insert_many.
+    NPC names are not unique, so like extract_npc this can still create two NPCs when
+    concurrent requests tag the same new name.
+    """
+    if not extraction_data.items:
+        return {"results": [], "created": 0, "updated": 0}
+    
+    now = datetime.utcnow()
+    operations = []
+    new_npcs = []
+    for item in extraction_data.items:
+        new_npc, _, update = npc_interaction_upsert(item.npc_name, extraction_data.session_id, item.extracted_text, now)
+        new_npcs.append(new_npc)
+        operations.append(UpdateOne({"name": item.npc_name}, update, upsert=True))
+    
+    try:
+        result = await db.npcs.bulk_write(operations, ordered=True)
+        ids_by_name = {}
+        for index in result.upserted_ids:
+            new_npc = new_npcs[index]
+            ids_by_name[new_npc.name] = new_npc.id
+            npc_name_matcher.set(new_npc.id, new_npc.name)
         
-        updated_npc = await db.npcs.find_one({"name": extraction_data.npc_name})
-        return {"action": "updated", "npc": NPC(**updated_npc)}
-    else:
-        # Create new NPC
-        new_npc = NPC(
-            name=extraction_data.npc_name,
-            notes=f"First mentioned: {extraction_data.extracted_text}",
-            history=[{
-                "session_id": extraction_data.session_id,
-                "interaction": extraction_data.extracted_text,
-                "timestamp": datetime.utcnow()
-            }]
-        )
+        existing = list({item.npc_name for item in extraction_data.items} - ids_by_name.keys())
+        if existing:
+            npcs = await db.npcs.find({"name": {"$in": existing}}, {"_id": 0, "id": 1, "name": 1}).to_list(None)
+            ids_by_name.update({npc["name"]: npc["id"] for npc in npcs})
         
-        await db.npcs.insert_one(new_npc.dict())
-        return {"action": "created", "npc": new_npc}
+        results = [
+            NPCExtractionResult(npc_name=item.npc_name, action="created" if index in result.upserted_ids else "updated",
+                                npc_id=ids_by_name.get(item.npc_name))
+            for index, item in enumerate(extraction_data.items)
+        ]
+        interactions = [
+            NPCInteraction(npc_id=r.npc_id, session_id=extraction_data.session_id,
+                           interaction=item.extracted_text, timestamp=now).dict()
+            for r, item in zip(results, extraction_data.items) if r.npc_id
+        ]
+        if interactions:
+            await db.npc_interactions.insert_many(interactions, ordered=False)
+    except PyMongoError as e:
+        logger.error(f"Error extracting NPCs: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error extracting NPCs: {str(e)}")
+    finally:
+        await read_cache.invalidate(NPCS_CACHE_KEY)
+    
+    return {
+        "results": results,
+        "created": len(result.upserted_ids),
+        "updated": len(results) - len(result.upserted_ids)
+    }
+
+@api_router.get("/npcs/{npc_id}/history", response_model=List[NPCInteraction])
+async def get_npc_history(
+    npc_id: str,
+    response: Response,
+    limit: int = Query(NPC_HISTORY_PAGE_SIZE, ge=1, le=NPC_HISTORY_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    username: str = Depends(authenticate)
+):
+    """Get an NPC's interactions, newest first. The next page cursor is returned in X-Next-Cursor"""
+    interactions, next_cursor = await fetch_keyset_page(
+        db.npc_interactions, {"npc_id": npc_id}, "timestamp", limit, cursor, {"_id": 0}
+    )
+    if not interactions and not cursor and not await db.npcs.find_one({"id": npc_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="NPC not found")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [NPCInteraction(**interaction) for interaction in interactions]
+
+@api_router.post("/migrate-npc-history")
+async def migrate_npc_history_route(username: str = Depends(authenticate)):
+    """Move embedded NPC history into the npc_interactions collection (admin only)"""
+    try:
+        migrated = await migrate_npc_history(db)
+        if migrated:
+            await read_cache.invalidate(NPCS_CACHE_KEY)
+        return {"message": "NPC history migrated", "npcs_migrated": migrated}
+    except PyMongoError as e:
+        logger.error(f"Error migrating NPC history: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error migrating NPC history: {str(e)}")
 
 # Auto-suggest NPCs from text
 @api_router.post("/suggest-npcs")
-async def suggest_npcs(text_data: dict, username: str = Depends(authenticate)):
+async def suggest_npcs(text_data: dict, response: Response, background: bool = False, username: str = Depends(authenticate)):
+    """With background=true the text is queued and the job is returned; poll /api/jobs/{id} for the result"""
     text = text_data.get("text", "")
-    suggested_names = await llm_service.extract_npcs_from_text(text)
-    return {"suggested_npcs": suggested_names}
+    if background:
+        response.status_code = status.HTTP_202_ACCEPTED
+        return Job(**await job_queue.submit(db, "suggest_npcs", {"text": text}))
+    return await suggest_npc_names(text)
+
+# Background job routes
+@api_router.post("/jobs", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(job_data: JobCreate, username: str = Depends(authenticate)):
+    try:
+        job = await job_queue.submit(db, job_data.type, {"text": job_data.text})
+        return Job(**job)
+    except PyMongoError as e:
+        logger.error(f"Error queueing job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error queueing job: {str(e)}")
+
+@api_router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str, username: str = Depends(authenticate)):
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "payload": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return Job(**job)
+
+# Full-text search
+@api_router.get("/search", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=1),
+    campaign_id: Optional[str] = None,
+    type: str = Query("all", pattern="^(all|sessions|npcs)$"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    username: str = Depends(authenticate)
+):
+    """
+    Ranked full-text search over sessions and NPCs using the text indexes.
+    campaign_id narrows session hits; NPCs are shared across campaigns.
+    """
+    score = {"$meta": "textScore"}
+    # Each collection returns its best offset + limit + 1 hits so the merged page and
+    # whether another page exists can be decided without reading further
+    window = offset + limit + 1
+    pattern = search_term_pattern(q)
+    hits = []
+    
+    try:
+        if type in ("all", "sessions"):
+            session_query = {"$text": {"$search": q}}
+            if campaign_id:
+                session_query["campaign_id"] = campaign_id
+            sessions = await db.sessions.find(
+                session_query,
+                {"_id": 0, "id": 1, "title": 1, "campaign_id": 1, "content": 1, "score": score}
+            ).sort([("score", score)]).limit(window).to_list(window)
+            hits.extend(search_hit_from_doc("session", doc, "title", ["content", "title"], pattern) for doc in sessions)
+        
+        if type in ("all", "npcs"):
+            npcs = await db.npcs.find(
+                {"$text": {"$search": q}},
+                {"_id": 0, "id": 1, "name": 1, "background": 1, "notes": 1, "score": score}
+            ).sort([("score", score)]).limit(window).to_list(window)
+            hits.extend(search_hit_from_doc("npc", doc, "name", ["background", "notes", "name"], pattern) for doc in npcs)
+    except PyMongoError as e:
+        logger.error(f"Error searching: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error searching: {str(e)}")
+    
+    hits.sort(key=lambda hit: hit.score, reverse=True)
+    page = hits[offset:offset + limit]
+    next_offset = offset + limit if len(hits) > offset + limit else None
+    return SearchResults(query=q, results=page, next_offset=next_offset)
 
 # Campaign routes
 @api_router.post("/campaigns", response_model=Campaign)
@@ -461,23 +2244,38 @@ async def create_campaign(campaign_data: CampaignCreate, username: str = Depends
         storage_dict = campaign_obj.dict()
         
         await db.campaigns.insert_one(storage_dict)
+        await invalidate_campaign_cache()
         return campaign_obj
     except Exception as e:
         logger.error(f"Error creating campaign: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating campaign: {str(e)}")
 
 @api_router.get("/campaigns", response_model=List[Campaign])
-async def get_campaigns(username: str = Depends(authenticate)):
+async def get_campaigns(request: Request, username: str = Depends(authenticate)):
     """Get all campaigns"""
-    campaigns = await db.campaigns.find({"is_active": True}).sort("created_at", -1).to_list(1000)
-    return [Campaign(**campaign) for campaign in campaigns]
+    campaigns = await read_cache.get_or_load(
+        ACTIVE_CAMPAIGNS_CACHE_KEY,
+        lambda: db.campaigns.find({"is_active": True}, {"_id": 0}).sort("created_at", -1).to_list(1000)
+    )
+    
+    headers = etag_headers(list_etag(campaigns))
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    return trusted_list_response(campaigns, Campaign, headers)
 
 @api_router.get("/campaigns/{campaign_id}", response_model=Campaign)
-async def get_campaign(campaign_id: str, username: str = Depends(authenticate)):
+async def get_campaign(campaign_id: str, request: Request, response: Response, username: str = Depends(authenticate)):
     """Get a specific campaign"""
-    campaign = await db.campaigns.find_one({"id": campaign_id})
+    campaign = await read_cache.get_or_load(
+        campaign_cache_key(campaign_id), lambda: db.campaigns.find_one({"id": campaign_id}, {"_id": 0})
+    )
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    headers = etag_headers(document_etag(campaign))
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
     return Campaign(**campaign)
 
 @api_router.put("/campaigns/{campaign_id}", response_model=Campaign)
@@ -487,16 +2285,20 @@ async def update_campaign(campaign_id: str, campaign_data: CampaignUpdate, usern
         update_data = {k: v for k, v in campaign_data.dict().items() if v is not None}
         update_data["updated_at"] = datetime.utcnow()
         
-        result = await db.campaigns.update_one(
+        updated_campaign = await db.campaigns.find_one_and_update(
             {"id": campaign_id}, 
-            {"$set": update_data}
+            {"$set": update_data},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.matched_count == 0:
+        if not updated_campaign:
             raise HTTPException(status_code=404, detail="Campaign not found")
+        await invalidate_campaign_cache(campaign_id)
         
-        updated_campaign = await db.campaigns.find_one({"id": campaign_id})
         return Campaign(**updated_campaign)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating campaign: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error updating campaign: {str(e)}")
@@ -510,41 +2312,273 @@ async def delete_campaign(campaign_id: str, username: str = Depends(authenticate
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Campaign not found")
+    await invalidate_campaign_cache(campaign_id)
     return {"message": "Campaign deleted successfully"}
 
 @api_router.get("/campaigns/{campaign_id}/sessions", response_model=List[Session])
-async def get_campaign_sessions(campaign_id: str, username: str = Depends(authenticate)):
-    """Get all sessions for a specific campaign"""
-    sessions = await db.sessions.find({"campaign_id": campaign_id}).sort("created_at", -1).to_list(1000)
-    return [Session(**session) for session in sessions]
+async def get_campaign_sessions(
+    campaign_id: str,
+    request: Request,
+    limit: int = Query(SESSION_PAGE_SIZE, ge=1, le=SESSION_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    username: str = Depends(authenticate)
+):
+    """
+    Get sessions for a specific campaign.
+    view=summary returns SessionSummary items instead of full sessions.
+    The next page cursor is returned in X-Next-Cursor.
+    """
+    return await list_sessions({"campaign_id": campaign_id}, request, limit, cursor, view)
+
+@api_router.get("/campaigns/{campaign_id}/stats", response_model=CampaignStats)
+async def get_campaign_stats(campaign_id: str, username: str = Depends(authenticate)):
+    """Get session, NPC and player counts for a campaign without loading its sessions"""
+    campaign = await db.campaigns.find_one({"id": campaign_id}, {"_id": 0, "id": 1, "players.status": 1})
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    players = campaign.get("players", [])
+    session_count = await db.sessions.count_documents({"campaign_id": campaign_id})
+    
+    pipeline = [
+        {"$match": {"campaign_id": campaign_id}},
+        {"$facet": {
+            "dates": [
+                {"$group": {
+                    "_id": None,
+                    "last_session_date": {"$max": "$structured_data.session_date"},
+                    "last_session_created_at": {"$max": "$created_at"},
+                }},
+            ],
+            "npcs": [
+                {"$project": {"names": {"$setUnion": [
+                    {"$ifNull": ["$structured_data.npcs_encountered.npc_name", []]},
+                    {"$ifNull": ["$npcs_mentioned", []]},
+                ]}}},
+                {"$unwind": "$names"},
+                {"$match": {"names": {"$ne": ""}}},
+                {"$group": {"_id": "$names"}},
+                {"$count": "count"},
+            ],
+        }},
+    ]
+    result = await db.sessions.aggregate(pipeline).to_list(1)
+    facets = result[0] if result else {}
+    dates = facets.get("dates") or [{}]
+    npcs = facets.get("npcs") or [{}]
+    
+    return CampaignStats(
+        campaign_id=campaign_id,
+        session_count=session_count,
+        npc_count=npcs[0].get("count", 0),
+        player_count=len(players),
+        active_player_count=sum(1 for p in players if p.get("status", "Active") == "Active"),
+        last_session_date=dates[0].get("last_session_date"),
+        last_session_created_at=dates[0].get("last_session_created_at"),
+    )
+
+# Campaign export
+EXPORT_BATCH_SIZE = 100
+
+def export_slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", (text or "").lower()).strip("-")[:60] or "untitled"
+
+def session_markdown(session: dict) -> str:
+    """Render a stored session as a Markdown document"""
+    lines = [f"# {session.get('title', '')}", ""]
+    structured = session.get("structured_data") or {}
+    if structured.get("session_number") is not None:
+        lines.append(f"- **Session:** {structured['session_number']}")
+    if structured.get("session_date"):
+        lines.append(f"- **Date:** {structured['session_date']}")
+    if structured.get("players_present"):
+        lines.append(f"- **Players:** {', '.join(structured['players_present'])}")
+    lines.append(f"- **Created:** {session['created_at'].isoformat()}")
+    lines.append("")
+    if session.get("content"):
+        lines += [session["content"], ""]
+    
+    for heading, key in (("Session Goal", "session_goal"), ("Notes", "notes"), ("Next Session Goals", "next_session_goals")):
+        if structured.get(key):
+            lines += [f"## {heading}", "", structured[key], ""]
+    
+    sections = (
+        ("Combat Encounters", "combat_encounters", ("description", "enemies", "outcome", "notable_events")),
+        ("Roleplay Encounters", "roleplay_encounters", ("description", "outcome", "importance")),
+        ("NPCs Encountered", "npcs_encountered", ("npc_name", "role", "notes")),
+        ("Loot", "loot", ("item_name", "description", "value", "recipient")),
+        ("Overarching Missions", "overarching_missions", ("mission_name", "status", "description", "notes")),
+    )
+    for heading, key, fields in sections:
+        items = structured.get(key) or []
+        if not items:
+            continue
+        lines += [f"## {heading}", ""]
+        for item in items:
+            values = [str(item.get(field)) for field in fields if item.get(field)]
+            lines.append(f"- {' — '.join(values)}")
+        lines.append("")
+    
+    if structured.get("notable_roleplay_moments"):
+        lines += ["## Notable Roleplay Moments", ""]
+        lines += [f"- {moment}" for moment in structured["notable_roleplay_moments"]]
+        lines.append("")
+    return "\n".join(lines)
+
+def npc_markdown(npc: dict) -> str:
+    """Render a stored NPC as a Markdown document"""
+    lines = [f"# {npc.get('name', '')}", ""]
+    for label, key in (("Status", "status"), ("Race", "race"), ("Class/Role", "class_role")):
+        if npc.get(key):
+            lines.append(f"- **{label}:** {npc[key]}")
+    lines.append("")
+    for heading, key in (("Appearance", "appearance"), ("Quirks & Mannerisms", "quirks_mannerisms"),
+                         ("Background", "background"), ("Notes", "notes")):
+        if npc.get(key):
+            lines += [f"## {heading}", "", npc[key], ""]
+    return "\n".join(lines)
+
+def npc_interaction_markdown(interaction: dict) -> str:
+    """Render one stored NPC interaction as a Markdown list item"""
+    return f"- **{interaction['timestamp']:%Y-%m-%d %H:%M}** {interaction.get('interaction', '')}\n"
+
+class ZipStreamBuffer:
+    """Write-only sink for zipfile whose contents are drained after every member"""
+    
+    def __init__(self):
+        self.chunks: List[bytes] = []
+    
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+async def next_or_none(cursor):
+    try:
+        return await cursor.__anext__()
+    except StopAsyncIteration:
+        return None
+
+async def export_documents(campaign_id: str):
+    """
+    Yield (kind, document) for the campaign, its sessions and the shared NPC directory straight from the cursors.
+    Every NPC is followed by its full interaction history from npc_interactions, oldest first,
+    since the NPC document itself only keeps the latest few entries. NPCs sorted by id are
+    merged with a single interactions cursor sorted by (npc_id, timestamp, id).
+    """
+    sessions = db.sessions.find({"campaign_id": campaign_id}, {"_id": 0}).sort([("created_at", 1), ("id", 1)])
+    async for session in sessions.batch_size(EXPORT_BATCH_SIZE):
+        yield "session", session
+    
+    interactions = db.npc_interactions.find({}, {"_id": 0}).sort(
+        [("npc_id", 1), ("timestamp", 1), ("id", 1)]
+    ).batch_size(EXPORT_BATCH_SIZE)
+    interaction = await next_or_none(interactions)
+    async for npc in db.npcs.find({}, {"_id": 0}).sort("id", 1).batch_size(EXPORT_BATCH_SIZE):
+        yield "npc", npc
+        # Interactions left behind by deleted NPCs sort between the NPCs and are skipped
+        while interaction is not None and interaction["npc_id"] <= npc["id"]:
+            if interaction["npc_id"] == npc["id"]:
+                yield "interaction", interaction
+            interaction = await next_or_none(interactions)
+    await interactions.close()
+
+async def export_campaign_ndjson(campaign: dict):
+    yield orjson.dumps({"type": "campaign", "data": trusted_document(campaign, Campaign)}) + b"\n"
+    models = {"session": Session, "npc": NPC, "interaction": NPCInteraction}
+    async for kind, document in export_documents(campaign["id"]):
+        yield orjson.dumps({"type": kind, "data": trusted_document(document, models[kind])}) + b"\n"
+
+async def export_campaign_markdown_zip(campaign: dict):
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        players = "\n".join(f"- {p.get('name', '')} ({p.get('character_name') or 'no character'})" for p in campaign.get("players", []))
+        archive.writestr("README.md", f"# {campaign['name']}\n\n{campaign.get('description', '')}\n\n## Players\n\n{players}\n")
+        yield buffer.drain()
+        # NPC files stay open while their interactions stream in, so long histories are never held in memory
+        npc_file = None
+        async for kind, document in export_documents(campaign["id"]):
+            if kind == "interaction":
+                if not npc_file_has_interactions:
+                    npc_file.write(b"\n## Interactions\n\n")
+                    npc_file_has_interactions = True
+                npc_file.write(npc_interaction_markdown(document).encode("utf-8"))
+                yield buffer.drain()
+                continue
+            if npc_file is not None:
+                npc_file.close()
+                npc_file = None
+            if kind == "session":
+                name = f"sessions/{document['created_at']:%Y-%m-%d}-{export_slug(document.get('title'))}-{document['id'][:8]}.md"
+                archive.writestr(name, session_markdown(document))
+            else:
+                npc_file = archive.open(f"npcs/{export_slug(document.get('name'))}-{document['id'][:8]}.md", mode="w")
+                npc_file.write(npc_markdown(document).encode("utf-8"))
+                npc_file_has_interactions = False
+            yield buffer.drain()
+        if npc_file is not None:
+            npc_file.close()
+    yield buffer.drain()
+
+@api_router.get("/campaigns/{campaign_id}/export")
+async def export_campaign(
+    campaign_id: str,
+    format: str = Query("ndjson", pattern="^(ndjson|markdown)$"),
+    username: str = Depends(authenticate)
+):
+    """
+    Stream a campaign, its sessions and the NPC directory with every NPC's interactions in constant memory.
+    format=ndjson yields one {"type", "data"} record per line; format=markdown yields a zip of Markdown files.
+    """
+    campaign = await db.campaigns.find_one({"id": campaign_id}, {"_id": 0})
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    slug = export_slug(campaign.get("name"))
+    if format == "markdown":
+        return StreamingResponse(
+            export_campaign_markdown_zip(campaign),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{slug}.zip"'}
+        )
+    return StreamingResponse(
+        export_campaign_ndjson(campaign),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{slug}.ndjson"'}
+    )
+
+async def raise_player_update_error(campaign_id: str, not_found_detail: str):
+    """Work out why a guarded player update matched nothing and raise the matching error"""
+    if not await db.campaigns.find_one({"id": campaign_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    raise HTTPException(status_code=404, detail=not_found_detail)
 
 @api_router.post("/campaigns/{campaign_id}/players")
 async def add_campaign_player(campaign_id: str, player_data: CampaignPlayer, username: str = Depends(authenticate)):
     """Add a player to a campaign"""
     try:
-        # Get the campaign
-        campaign = await db.campaigns.find_one({"id": campaign_id})
+        # The filter guards name uniqueness so concurrent adds cannot create duplicates
+        campaign = await db.campaigns.find_one_and_update(
+            {"id": campaign_id, "players.name": {"$ne": player_data.name}},
+            {"$push": {"players": player_data.dict()}, "$set": {"updated_at": datetime.utcnow()}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
         if not campaign:
-            raise HTTPException(status_code=404, detail="Campaign not found")
-        
-        campaign_obj = Campaign(**campaign)
-        
-        # Check if player name already exists
-        existing_names = [p.name for p in campaign_obj.players]
-        if player_data.name in existing_names:
+            if not await db.campaigns.find_one({"id": campaign_id}, {"_id": 1}):
+                raise HTTPException(status_code=404, detail="Campaign not found")
             raise HTTPException(status_code=400, detail="Player name already exists in this campaign")
+        await invalidate_campaign_cache(campaign_id)
         
-        # Add the new player
-        campaign_obj.players.append(player_data)
-        campaign_obj.updated_at = datetime.utcnow()
-        
-        # Update in database
-        await db.campaigns.update_one(
-            {"id": campaign_id},
-            {"$set": campaign_obj.dict()}
-        )
-        
-        return {"message": "Player added successfully", "player": player_data}
+        return {"message": "Player added successfully", "player": player_data, "campaign": Campaign(**campaign)}
     except HTTPException:
         raise
     except Exception as e:
@@ -555,32 +2589,19 @@ async def add_campaign_player(campaign_id: str, player_data: CampaignPlayer, use
 async def update_campaign_player(campaign_id: str, player_id: str, player_data: CampaignPlayer, username: str = Depends(authenticate)):
     """Update a player in a campaign"""
     try:
-        campaign = await db.campaigns.find_one({"id": campaign_id})
-        if not campaign:
-            raise HTTPException(status_code=404, detail="Campaign not found")
-        
-        campaign_obj = Campaign(**campaign)
-        
-        # Find and update the player
-        player_found = False
-        for i, player in enumerate(campaign_obj.players):
-            if player.id == player_id:
-                campaign_obj.players[i] = player_data
-                player_found = True
-                break
-        
-        if not player_found:
-            raise HTTPException(status_code=404, detail="Player not found in campaign")
-        
-        campaign_obj.updated_at = datetime.utcnow()
-        
-        # Update in database
-        await db.campaigns.update_one(
-            {"id": campaign_id},
-            {"$set": campaign_obj.dict()}
+        # The player keeps the id it is addressed by
+        player_data.id = player_id
+        campaign = await db.campaigns.find_one_and_update(
+            {"id": campaign_id, "players.id": player_id},
+            {"$set": {"players.$": player_data.dict(), "updated_at": datetime.utcnow()}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
+        if not campaign:
+            await raise_player_update_error(campaign_id, "Player not found in campaign")
+        await invalidate_campaign_cache(campaign_id)
         
-        return {"message": "Player updated successfully", "player": player_data}
+        return {"message": "Player updated successfully", "player": player_data, "campaign": Campaign(**campaign)}
     except HTTPException:
         raise
     except Exception as e:
@@ -591,28 +2612,17 @@ async def update_campaign_player(campaign_id: str, player_id: str, player_data:
 async def remove_campaign_player(campaign_id: str, player_id: str, username: str = Depends(authenticate)):
     """Remove a player from a campaign"""
     try:
-        campaign = await db.campaigns.find_one({"id": campaign_id})
-        if not campaign:
-            raise HTTPException(status_code=404, detail="Campaign not found")
-        
-        campaign_obj = Campaign(**campaign)
-        
-        # Find and remove the player
-        original_count = len(campaign_obj.players)
-        campaign_obj.players = [p for p in campaign_obj.players if p.id != player_id]
-        
-        if len(campaign_obj.players) == original_count:
-            raise HTTPException(status_code=404, detail="Player not found in campaign")
-        
-        campaign_obj.updated_at = datetime.utcnow()
-        
-        # Update in database
-        await db.campaigns.update_one(
-            {"id": campaign_id},
-            {"$set": campaign_obj.dict()}
+        campaign = await db.campaigns.find_one_and_update(
+            {"id": campaign_id, "players.id": player_id},
+            {"$pull": {"players": {"id": player_id}}, "$set": {"updated_at": datetime.utcnow()}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
         )
+        if not campaign:
+            await raise_player_update_error(campaign_id, "Player not found in campaign")
+        await invalidate_campaign_cache(campaign_id)
         
-        return {"message": "Player removed successfully"}
+        return {"message": "Player removed successfully", "campaign": Campaign(**campaign)}
     except HTTPException:
         raise
     except Exception as e:
@@ -638,6 +2648,7 @@ async def initialize_default_campaign(username: str = Depends(authenticate)):
         )
         
         await db.campaigns.insert_one(default_campaign.dict())
+        await invalidate_campaign_cache()
         
         # Update all existing sessions without campaign_id
         sessions_without_campaign = await db.sessions.find({"campaign_id": {"$exists": False}}).to_list(None)
@@ -657,6 +2668,276 @@ async def initialize_default_campaign(username: str = Depends(authenticate)):
         logger.error(f"Error initializing default campaign: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error initializing default campaign: {str(e)}")
 
+# Bulk import
+IMPORT_BATCH_SIZE = 500
+IMPORT_MAX_ERRORS = 1000
+# A record can never be larger than a MongoDB document
+IMPORT_MAX_LINE_BYTES = 16 * 1024 * 1024
+
+IMPORT_MODELS = {
+    "campaign": ("campaigns", Campaign),
+    "session": ("sessions", Session),
+    "npc": ("npcs", NPC),
+    "interaction": ("npc_interactions", NPCInteraction),
+}
+
+# Interactions never change once recorded, so they are upserted by id in both modes
+# and restoring the same backup twice does not report them as failures
+IMPORT_UPSERT_ALWAYS = {"npc_interactions"}
+
+class ImportBatch:
+    """Validated records of one type waiting to be written, with their NDJSON line numbers"""
+    
+    def __init__(self):
+        self.documents: List[dict] = []
+        self.lines: List[int] = []
+
+def validate_import_record(record: Any) -> tuple:
+    """Validate one NDJSON record as written by the campaign export; returns (collection, document)"""
+    if not isinstance(record, dict) or record.get("type") not in IMPORT_MODELS or not isinstance(record.get("data"), dict):
+        raise ValueError('Expected {"type": "campaign" | "session" | "npc" | "interaction", "data": {...}}')
+    collection, model = IMPORT_MODELS[record["type"]]
+    data = record["data"]
+    if record["type"] == "session":
+        data = prepare_session_for_storage(data)
+    return collection, model(**data).dict()
+
+async def write_import_batch(collection: str, batch: ImportBatch, mode: str, report: dict):
+    """Write one batch unordered, turning per-document write errors into per-line errors"""
+    try:
+        if mode == "upsert" or collection in IMPORT_UPSERT_ALWAYS:
+            result = await db[collection].bulk_write(
+                [ReplaceOne({"id": document["id"]}, document, upsert=True) for document in batch.documents],
+                ordered=False
+            )
+            report["inserted"] += result.upserted_count
+            report["updated"] += result.matched_count
+        else:
+            result = await db[collection].insert_many(batch.documents, ordered=False)
+            report["inserted"] += len(result.inserted_ids)
+    except BulkWriteError as e:
+        details = e.details
+        report["inserted"] += details.get("nInserted", 0) + details.get("nUpserted", 0)
+        report["updated"] += details.get("nMatched", 0)
+        for error in details.get("writeErrors", []):
+            add_import_error(report, batch.lines[error["index"]], error.get("errmsg", "Write error"))
+    batch.documents = []
+    batch.lines = []
+
+def add_import_error(report: dict, line: int, message: str):
+    report["failed"] += 1
+    if len(report["errors"]) < IMPORT_MAX_ERRORS:
+        report["errors"].append({"line": line, "error": message})
+    else:
+        report["errors_truncated"] = True
+
+async def ndjson_lines(request: Request):
+    """
+    Yield (line number, raw line) from a streamed NDJSON request body.
+    Lines longer than IMPORT_MAX_LINE_BYTES are discarded while they stream in and yielded as None.
+    """
+    pending = bytearray()
+    # Bytes of pending already searched for a newline, so long lines are not rescanned per chunk
+    scanned = 0
+    oversized = False
+    number = 0
+    async for chunk in request.stream():
+        pending += chunk
+        start = 0
+        while (end := pending.find(b"\n", max(start, scanned))) >= 0:
+            number += 1
+            yield number, None if oversized or end - start > IMPORT_MAX_LINE_BYTES else bytes(pending[start:end])
+            oversized = False
+            start = end + 1
+        del pending[:start]
+        scanned = len(pending)
+        if len(pending) > IMPORT_MAX_LINE_BYTES:
+            oversized = True
+            pending.clear()
+            scanned = 0
+    if pending or oversized:
+        yield number + 1, None if oversized else bytes(pending)
+
+@api_router.post("/import")
+async def import_records(
+    request: Request,
+    mode: str = Query("insert", pattern="^(insert|upsert)$"),
+    username: str = Depends(authenticate)
+):
+    """
+    Import campaigns, sessions, NPCs and NPC interactions from a streamed NDJSON body in the campaign export format.
+    Records are validated and written in unordered batches; mode=upsert replaces documents by id.
+    Invalid records and write errors are reported per line without stopping the import.
+    """
+    report = {"received": 0, "inserted": 0, "updated": 0, "failed": 0, "errors": [], "errors_truncated": False}
+    batches = {collection: ImportBatch() for collection, _ in IMPORT_MODELS.values()}
+    
+    try:
+        async for number, line in ndjson_lines(request):
+            if line is None:
+                report["received"] += 1
+                add_import_error(report, number, f"Line exceeds {IMPORT_MAX_LINE_BYTES} bytes")
+                continue
+            if not line.strip():
+                continue
+            report["received"] += 1
+            try:
+                collection, document = validate_import_record(orjson.loads(line))
+            except (orjson.JSONDecodeError, ValueError, TypeError) as e:
+                # pydantic's ValidationError is a ValueError
+                add_import_error(report, number, str(e))
+                continue
+            
+            batch = batches[collection]
+            batch.documents.append(document)
+            batch.lines.append(number)
+            if len(batch.documents) >= IMPORT_BATCH_SIZE:
+                await write_import_batch(collection, batch, mode, report)
+        
+        for collection, batch in batches.items():
+            if batch.documents:
+                await write_import_batch(collection, batch, mode, report)
+    except PyMongoError as e:
+        logger.error(f"Error importing records: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error importing records: {str(e)}")
+    finally:
+        await read_cache.clear_all()
+        npc_name_matcher.expire()
+    
+    return report
+
+# Slow query log
+@api_router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    sort: str = Query("total_ms", pattern="^(total_ms|max_ms|count|last_seen)$"),
+    username: str = Depends(authenticate)
+):
+    """Slowest MongoDB query shapes since startup, worst first"""
+    return {"threshold_ms": slow_query_recorder.threshold_ms, "queries": slow_query_recorder.worst(limit, sort)}
+
+@api_router.delete("/slow-queries")
+async def clear_slow_queries(username: str = Depends(authenticate)):
+    slow_query_recorder.clear()
+    return {"message": "Slow query log cleared"}
+
+# Cache statistics
+@api_router.get("/cache/stats")
+async def get_cache_stats(username: str = Depends(authenticate)):
+    """Hit/miss counters of the in-process read cache and the stored model results"""
+    return {**read_cache.stats(), "model_results": llm_result_cache.stats()}
+
+# Request profiling
+# An admin can profile a single request by sending X-Profile: 1 (or ?profile=1)
+# with valid credentials. A sampler thread records the event loop thread's stack
+# every PROFILE_SAMPLE_INTERVAL seconds and the result is stored in the profiles
+# collection as folded stacks (flamegraph.pl / speedscope format) under the request id.
+# Samples are of the whole event loop, so other requests served at the same time show up too.
+# Requests without the flag only pay for a header scan.
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', '0.001'))
+
+class StackSampler:
+    """Counts the folded stacks of one thread at a fixed interval"""
+    
+    def __init__(self, thread_id: int, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Dict[str, int] = {}
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="request-profiler", daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+    
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+    
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]))
+
+def profiling_requested(scope) -> bool:
+    if re.search(rb"(^|&)profile=(1|true)(&|$)", scope.get("query_string", b"")):
+        return True
+    return any(name == b"x-profile" and value in (b"1", b"true") for name, value in scope["headers"])
+
+def admin_request(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"authorization" and value[:6].lower() == b"basic ":
+            try:
+                username, _, password = base64.b64decode(value[6:]).decode("utf-8").partition(":")
+            except (ValueError, UnicodeDecodeError):
+                return False
+            return valid_credentials(username, password)
+    return False
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that ask for it"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiling_requested(scope) or not admin_request(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        request_id = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")[:64] or str(uuid.uuid4())
+        status_code = 500
+        
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", request_id.encode("latin-1"))]
+            await send(message)
+        
+        sampler = StackSampler(threading.get_ident())
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            profile = {
+                "id": request_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                "samples": sum(sampler.stacks.values()),
+                "sample_interval_ms": sampler.interval * 1000,
+                "folded": sampler.folded(),
+                "created_at": started_at,
+            }
+            try:
+                await db.profiles.replace_one({"id": request_id}, profile, upsert=True)
+            except PyMongoError as e:
+                logger.error(f"Error storing profile {request_id}: {str(e)}")
+
+@api_router.get("/profiles/{request_id}")
+async def get_profile(request_id: str, format: str = Query("json", pattern="^(json|folded)$"), username: str = Depends(authenticate)):
+    """A stored request profile; format=folded returns the stacks as plain text for flame graph tools"""
+    profile = await db.profiles.find_one({"id": request_id}, {"_id": 0})
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "folded":
+        return Response(profile["folded"], media_type="text/plain")
+    return profile
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -669,6 +2950,8 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["*"]
 )
+app.add_middleware(PrometheusMiddleware)
+app.add_middleware(ProfilingMiddleware)
 
 # Configure logging
 logging.basicConfig(
@@ -677,10 +2960,50 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def prepare_database_on_startup():
+    # Each worker process opens its own client here, after uvicorn has forked it
+    connect_mongo()
+    if READ_CACHE_SHARED:
+        read_cache.share(db.cache_versions)
+    try:
+        await ensure_indexes(db)
+    except PyMongoError as e:
+        # Index problems must not keep the API from starting
+        logger.error(f"Error verifying indexes: {str(e)}")
+    try:
+        migrated = await migrate_npc_history(db)
+        if migrated:
+            logger.info(f"Migrated history of {migrated} NPCs to npc_interactions")
+    except PyMongoError as e:
+        logger.error(f"Error migrating NPC history: {str(e)}")
+    slow_query_recorder.start(client, asyncio.get_running_loop())
+    job_queue.start(db)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    try:
+        await job_queue.stop()
+    except PyMongoError as e:
+        logger.error(f"Error requeueing interrupted jobs: {str(e)}")
+    await llm_service.aclose()
+    close_mongo()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Drop this worker's live gauges from the aggregated metrics
+        multiprocess.mark_process_dead(os.getpid())
 
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(username: str = Depends(authenticate)):
+    """
+    Prometheus scrape endpoint; aggregates all workers when PROMETHEUS_MULTIPROC_DIR is set.
+    The backend port is published directly, so scrapes use the API's Basic auth credentials.
+    """
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -7,6 +7,7 @@ Tests all CRUD operations and core functionality
 import requests
 import sys
 import json
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional
 
@@ -114,6 +115,23 @@ class DDNoteAPITester:
             return self.log_test("Get Session by ID", True, f"- Title: {data.get('title', 'No title')}")
         return self.log_test("Get Session by ID", False, f"- Response: {data}")
 
+    def test_conditional_get_session(self):
+        """Test that a matching If-None-Match returns 304 Not Modified"""
+        if not self.session_id:
+            return self.log_test("Conditional Get Session", False, "- No session ID available")
+        
+        url = f"{self.api_url}/sessions/{self.session_id}"
+        try:
+            first = requests.get(url, auth=self.auth, timeout=10)
+            etag = first.headers.get("ETag")
+            if not etag:
+                return self.log_test("Conditional Get Session", False, "- No ETag header")
+            second = requests.get(url, auth=self.auth, headers={"If-None-Match": etag}, timeout=10)
+            return self.log_test("Conditional Get Session", second.status_code == 304, 
+                               f"- ETag: {etag}, Status: {second.status_code}")
+        except Exception as e:
+            return self.log_test("Conditional Get Session", False, f"- Error: {str(e)}")
+
     def test_update_session(self):
         """Test updating a session"""
         if not self.session_id:
@@ -192,6 +210,34 @@ class DDNoteAPITester:
             return self.log_test("Extract NPC", True, f"- Action: {action}, NPC: {npc_name}")
         return self.log_test("Extract NPC", False, f"- Response: {data}")
 
+    def test_extract_npcs_bulk(self):
+        """Test tagging several NPCs from one session in a single request"""
+        if not self.session_id:
+            return self.log_test("Extract NPCs Bulk", False, "- No session ID available")
+        
+        extraction_data = {
+            "session_id": self.session_id,
+            "items": [
+                {"npc_name": "Elara the Barmaid", "extracted_text": "Elara refilled the party's mugs"},
+                {"npc_name": "Borin Stonefist", "extracted_text": "Borin haggled over the price of rope"}
+            ]
+        }
+        success, data = self.make_request('POST', 'extract-npcs', extraction_data)
+        if success and len(data.get('results', [])) == 2:
+            return self.log_test("Extract NPCs Bulk", True, 
+                               f"- Created: {data.get('created')}, Updated: {data.get('updated')}")
+        return self.log_test("Extract NPCs Bulk", False, f"- Response: {data}")
+
+    def test_get_npc_history(self):
+        """Test the paginated NPC interaction history"""
+        if not self.npc_id:
+            return self.log_test("Get NPC History", False, "- No NPC ID available")
+        
+        success, data = self.make_request('GET', f'npcs/{self.npc_id}/history?limit=10')
+        if success and isinstance(data, list):
+            return self.log_test("Get NPC History", True, f"- Interaction Count: {len(data)}")
+        return self.log_test("Get NPC History", False, f"- Response: {data}")
+
     def test_suggest_npcs(self):
         """Test NPC suggestion functionality"""
         text_data = {
@@ -203,6 +249,33 @@ class DDNoteAPITester:
             return self.log_test("Suggest NPCs", True, f"- Suggestions: {len(suggestions)} found: {suggestions}")
         return self.log_test("Suggest NPCs", False, f"- Response: {data}")
 
+    def test_background_job(self):
+        """Test queueing NPC suggestion as a background job and polling its status"""
+        text_data = {"type": "suggest_npcs", "text": "Captain Varis the Bold hailed the party from the docks."}
+        success, data = self.make_request('POST', 'jobs', text_data, 202)
+        if not (success and 'id' in data):
+            return self.log_test("Background Job", False, f"- Response: {data}")
+        
+        job = data
+        for _ in range(30):
+            if job.get('status') in ('completed', 'failed'):
+                break
+            time.sleep(1)
+            success, job = self.make_request('GET', f"jobs/{data['id']}")
+            if not success:
+                return self.log_test("Background Job", False, f"- Response: {job}")
+        completed = job.get('status') == 'completed' and 'suggested_npcs' in (job.get('result') or {})
+        return self.log_test("Background Job", completed, f"- Status: {job.get('status')}, Result: {job.get('result')}")
+
+    def test_search(self):
+        """Test ranked full-text search over sessions and NPCs"""
+        success, data = self.make_request('GET', 'search?q=barmaid')
+        if success and isinstance(data.get('results'), list):
+            results = data['results']
+            ranked = all(a['score'] >= b['score'] for a, b in zip(results, results[1:]))
+            return self.log_test("Search", ranked, f"- Result Count: {len(results)}")
+        return self.log_test("Search", False, f"- Response: {data}")
+
     def test_delete_npc(self):
         """Test deleting an NPC"""
         if not self.npc_id:
@@ -341,6 +414,26 @@ class DDNoteAPITester:
                                f"- ID: {self.structured_session_id}, Type: {data.get('session_type')}")
         return self.log_test("Create Structured Session", False, f"- Response: {data}")
 
+    def test_patch_structured_data(self):
+        """Test adding, updating and removing a single loot item without resending the session"""
+        if not hasattr(self, 'structured_session_id') or not self.structured_session_id:
+            return self.log_test("Patch Structured Data", False, "- No structured session ID available")
+        
+        url = f"{self.api_url}/sessions/{self.structured_session_id}/structured-data"
+        try:
+            added = requests.patch(url, auth=self.auth, timeout=10, json={"operations": [
+                {"op": "add", "section": "loot", "item": {"item_name": "Bag of Holding", "value": "4000 gp"}}
+            ]})
+            item_id = added.json().get('item_ids', [None])[0]
+            updated = requests.patch(url, auth=self.auth, timeout=10, json={"operations": [
+                {"op": "update", "section": "loot", "item_id": item_id, "item": {"recipient": "Thorin"}},
+                {"op": "remove", "section": "loot", "item_id": item_id}
+            ]})
+            success = added.status_code == 200 and updated.status_code == 200 and updated.json().get('applied') == 2
+            return self.log_test("Patch Structured Data", success, f"- Item ID: {item_id}")
+        except Exception as e:
+            return self.log_test("Patch Structured Data", False, f"- Error: {str(e)}")
+
     def test_export_structured_session(self):
         """Test exporting structured session data"""
         if not hasattr(self, 'structured_session_id') or not self.structured_session_id:
@@ -525,6 +618,49 @@ class DDNoteAPITester:
             return self.log_test("Get Campaign Sessions", True, f"- Session Count: {len(data)}")
         return self.log_test("Get Campaign Sessions", False, f"- Response: {data}")
     
+    def test_get_campaign_stats(self):
+        """Test retrieving aggregated stats for a specific campaign"""
+        if not self.campaign_id:
+            return self.log_test("Get Campaign Stats", False, "- No campaign ID available")
+        
+        success, data = self.make_request('GET', f'campaigns/{self.campaign_id}/stats')
+        if success and 'session_count' in data and 'npc_count' in data and 'player_count' in data:
+            return self.log_test("Get Campaign Stats", True, 
+                               f"- Sessions: {data['session_count']}, NPCs: {data['npc_count']}, Players: {data['player_count']}")
+        return self.log_test("Get Campaign Stats", False, f"- Response: {data}")
+    
+    def test_export_campaign(self):
+        """Test streaming NDJSON export of a campaign"""
+        if not self.campaign_id:
+            return self.log_test("Export Campaign", False, "- No campaign ID available")
+        
+        try:
+            response = requests.get(f"{self.api_url}/campaigns/{self.campaign_id}/export", auth=self.auth, timeout=30)
+            records = [json.loads(line) for line in response.text.splitlines() if line]
+            success = response.status_code == 200 and records and records[0].get('type') == 'campaign'
+            return self.log_test("Export Campaign", bool(success), f"- Records: {len(records)}")
+        except Exception as e:
+            return self.log_test("Export Campaign", False, f"- Error: {str(e)}")
+    
+    def test_export_import_round_trip(self):
+        """Test that a campaign export imports back without errors, NPC interactions included"""
+        if not self.campaign_id:
+            return self.log_test("Export/Import Round Trip", False, "- No campaign ID available")
+        
+        try:
+            export = requests.get(f"{self.api_url}/campaigns/{self.campaign_id}/export", auth=self.auth, timeout=30)
+            records = [json.loads(line) for line in export.text.splitlines() if line]
+            response = requests.post(f"{self.api_url}/import?mode=upsert", data=export.content, auth=self.auth,
+                                     headers={'Content-Type': 'application/x-ndjson'}, timeout=60)
+            report = response.json()
+            interactions = sum(1 for record in records if record.get('type') == 'interaction')
+            success = (response.status_code == 200 and report.get('received') == len(records) and report.get('failed') == 0
+                       and report.get('inserted', 0) + report.get('updated', 0) == len(records))
+            return self.log_test("Export/Import Round Trip", success,
+                               f"- Records: {len(records)}, Interactions: {interactions}, Report: {report}")
+        except Exception as e:
+            return self.log_test("Export/Import Round Trip", False, f"- Error: {str(e)}")
+    
     def test_create_session_with_campaign(self):
         """Test creating a session linked to a campaign"""
         if not self.campaign_id:
@@ -555,6 +691,30 @@ class DDNoteAPITester:
                                f"- Session Count: {len(data)}, All Match Campaign: {all_match_campaign}")
         return self.log_test("Get Sessions by Campaign", False, f"- Response: {data}")
     
+    def test_get_sessions_summary_view(self):
+        """Test the lightweight summary view of the session list"""
+        success, data = self.make_request('GET', 'sessions?view=summary')
+        if success and isinstance(data, list):
+            summary_only = all('content' not in session and 'structured_data' not in session for session in data)
+            return self.log_test("Get Sessions Summary View", summary_only, f"- Session Count: {len(data)}")
+        return self.log_test("Get Sessions Summary View", False, f"- Response: {data}")
+    
+    def test_paginate_sessions(self):
+        """Test keyset pagination of the session list via X-Next-Cursor"""
+        try:
+            first = requests.get(f"{self.api_url}/sessions", params={"limit": 1}, auth=self.auth, timeout=10)
+            next_cursor = first.headers.get("X-Next-Cursor")
+            if first.status_code != 200 or len(first.json()) > 1:
+                return self.log_test("Paginate Sessions", False, f"- Status: {first.status_code}")
+            if not next_cursor:
+                return self.log_test("Paginate Sessions", True, "- Single page only")
+            
+            second = requests.get(f"{self.api_url}/sessions", params={"limit": 1, "cursor": next_cursor}, auth=self.auth, timeout=10)
+            pages_differ = second.status_code == 200 and second.json() and second.json()[0]['id'] != first.json()[0]['id']
+            return self.log_test("Paginate Sessions", bool(pages_differ), f"- Next Cursor: {next_cursor[:16]}...")
+        except Exception as e:
+            return self.log_test("Paginate Sessions", False, f"- Error: {str(e)}")
+    
     def test_initialize_default_campaign(self):
         """Test initializing a default campaign for existing sessions"""
         success, data = self.make_request('POST', 'initialize-default-campaign')
@@ -598,12 +758,14 @@ class DDNoteAPITester:
         self.test_create_session()
         self.test_get_sessions()
         self.test_get_session_by_id()
+        self.test_conditional_get_session()
         self.test_update_session()
 
         # NEW: Structured Session Template Tests
         print("\n🆕 Testing New Structured Session Features:")
         self.test_structured_session_template()
         self.test_create_structured_session()
+        self.test_patch_structured_data()
         self.test_export_structured_session()
         self.test_mixed_session_types()
         self.test_structured_session_validation()
@@ -616,7 +778,11 @@ class DDNoteAPITester:
 
         # Advanced functionality tests
         self.test_extract_npc()
+        self.test_extract_npcs_bulk()
+        self.test_get_npc_history()
         self.test_suggest_npcs()
+        self.test_background_job()
+        self.test_search()
         
         # NEW: Campaign Management Tests
         print("\n🆕 Testing Campaign Management Features:")
@@ -633,7 +799,12 @@ class DDNoteAPITester:
         # Session-Campaign Integration Tests
         self.test_create_session_with_campaign()
         self.test_get_campaign_sessions()
+        self.test_get_campaign_stats()
+        self.test_export_campaign()
+        self.test_export_import_round_trip()
         self.test_get_sessions_by_campaign()
+        self.test_paginate_sessions()
+        self.test_get_sessions_summary_view()
         
         # Default Campaign Initialization
         self.test_initialize_default_campaign()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Synthetic large-campaign dataset generator for the D&D Note-Taking backend.
+
+Creates campaigns with players, sessions with long free-form content and fully
+populated structured data, and NPCs with deep interaction histories, all derived
+from --seed so the same arguments always produce the same documents. Campaigns
+are generated in parallel processes (each has its own random stream) and written
+with unordered insert_many batches from a small thread pool.
+
+NPC history follows the current storage layout: every interaction goes to
+npc_interactions and the NPC keeps the latest few plus interaction_count.
+--legacy-history embeds the full history in the NPC instead (the layout that
+/api/migrate-npc-history converts).
+
+Usage:
+    python benchmarks/generate_dataset.py --campaigns 100 --sessions-per-campaign 1000 --drop
+    python benchmarks/generate_dataset.py --database dnd_notes --campaigns 2 --players 6 --seed 7
+"""
+
+import os
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import typer
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from server import (  # noqa: E402
+    NPC_RECENT_HISTORY, REQUIRED_INDEXES, NPC, Campaign, NPCInteraction, Session,
+)
+
+COLLECTIONS = ("campaigns", "sessions", "npcs", "npc_interactions")
+START_DATE = datetime(2020, 1, 3, 19, 0)
+
+FIRST_NAMES = ["Varis", "Mira", "Thorin", "Elara", "Brom", "Kael", "Sera", "Dorn", "Lyra", "Garrick",
+               "Isolde", "Fenn", "Talia", "Osric", "Nyx", "Rowan", "Hilda", "Cassius", "Wren", "Aldric"]
+LAST_NAMES = ["Thornwood", "Ashdown", "Blackwater", "Stormcaller", "Ironfoot", "Greymantle", "Duskbane",
+              "Highcliff", "Emberfall", "Silverleaf", "Mossbrook", "Ravencrest"]
+RACES = ["Human", "Elf", "Dwarf", "Halfling", "Gnome", "Tiefling", "Half-Orc", "Dragonborn"]
+ROLES = ["Merchant", "Innkeeper", "Guard Captain", "Priest", "Smuggler", "Noble", "Blacksmith", "Sage", "Ferryman"]
+STATUSES = ["Alive", "Alive", "Alive", "Unknown", "Dead", "Missing"]
+PLACES = ["the Ashfall pass", "the sunken monastery", "Blackwater docks", "the Emberfall mines",
+          "the Silverleaf court", "the old ferry", "the ruined watchtower", "the Greymantle library"]
+ENEMIES = ["Goblins x6", "Ogre", "Bandits x4", "Young green dragon", "Skeletons x8", "Cultists x3", "Owlbear"]
+ITEMS = ["Potion of Healing", "Bag of Holding", "+1 Longsword", "Scroll of Fireball", "Cloak of Elvenkind",
+         "Silver dagger", "Map of the Underdark", "Ring of Protection"]
+MISSIONS = ["The Ashen Crown", "Debt of the Ferryman", "Cult of the Drowned God", "The Missing Heir"]
+SENTENCES = [
+    "The party pressed on through the rain toward {place}.",
+    "{npc} warned them that the road ahead was watched.",
+    "A heated argument broke out over how to split the reward.",
+    "{npc} offered a deal that sounded too good to be true.",
+    "Scouts reported movement near {place} just after nightfall.",
+    "The rogue slipped away to follow a hooded figure through the market.",
+    "An old map hinted at a second entrance hidden beneath {place}.",
+    "{npc} recognised the sigil and refused to say more.",
+    "The cleric spent the evening tending wounds and praying for guidance.",
+    "Strange lights flickered over the water as the fog rolled in.",
+    "Negotiations with {npc} stalled until the wizard produced the letter.",
+    "They camped in the shadow of {place}, keeping a double watch.",
+]
+
+
+def uuid_from(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def paragraph(rng, npc_names):
+    return " ".join(
+        rng.choice(SENTENCES).format(npc=rng.choice(npc_names) if npc_names else "A stranger", place=rng.choice(PLACES))
+        for _ in range(rng.randint(4, 8))
+    )
+
+
+def campaign_documents(seed, index, players, sessions, npcs, history, paragraphs, legacy_history):
+    """All documents of one campaign, by collection; each campaign has its own random stream"""
+    rng = random.Random(f"{seed}:{index}")
+    started = START_DATE + timedelta(days=index)
+    campaign_id = uuid_from(rng)
+    party = [{
+        "id": uuid_from(rng),
+        "name": f"Player {index}.{p}",
+        "character_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "status": rng.choice(["Active", "Active", "Active", "Inactive"]),
+        "notes": "",
+        "joined_date": started,
+    } for p in range(players)]
+    last_session_at = started + timedelta(weeks=max(sessions - 1, 0))
+    campaign = {
+        "id": campaign_id,
+        "name": f"Campaign {index}: {rng.choice(MISSIONS)}",
+        "description": paragraph(rng, []),
+        "dm_name": f"DM {index}",
+        "players": party,
+        "is_active": True,
+        "created_at": started,
+        "updated_at": last_session_at,
+    }
+
+    npc_ids = [uuid_from(rng) for _ in range(npcs)]
+    npc_names = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}-{n}" for n in range(npcs)]
+
+    session_docs = []
+    for number in range(sessions):
+        created_at = started + timedelta(weeks=number)
+        present = [player["character_name"] for player in party if rng.random() < 0.85]
+        met = rng.sample(npc_names, min(len(npc_names), rng.randint(1, 5)))
+        structured = {
+            "session_number": number + 1,
+            "session_date": created_at.date().isoformat(),
+            "players_present": present,
+            "session_goal": f"Reach {rng.choice(PLACES)}",
+            "combat_encounters": [{
+                "id": uuid_from(rng), "description": f"Ambush near {rng.choice(PLACES)}",
+                "enemies": rng.choice(ENEMIES), "outcome": rng.choice(["Victory", "Retreat", "Stalemate"]),
+                "notable_events": paragraph(rng, met),
+            } for _ in range(rng.randint(1, 4))],
+            "roleplay_encounters": [{
+                "id": uuid_from(rng), "description": paragraph(rng, met),
+                "npcs_involved": rng.sample(met, min(len(met), 2)), "outcome": "Information gained",
+                "importance": rng.choice(["Low", "Medium", "High"]),
+            } for _ in range(rng.randint(1, 4))],
+            "npcs_encountered": [{
+                "id": uuid_from(rng), "npc_name": name, "role": rng.choice(ROLES),
+                "notes": paragraph(rng, [name]), "first_encounter": rng.random() < 0.2,
+            } for name in met],
+            "loot": [{
+                "id": uuid_from(rng), "item_name": rng.choice(ITEMS), "description": "Found in a locked chest",
+                "value": f"{rng.randint(1, 500)} gp", "recipient": rng.choice(present) if present else "",
+            } for _ in range(rng.randint(0, 5))],
+            "notes": paragraph(rng, met),
+            "notable_roleplay_moments": [paragraph(rng, met) for _ in range(rng.randint(1, 3))],
+            "next_session_goals": f"Return to {rng.choice(PLACES)}",
+            "overarching_missions": [{
+                "id": uuid_from(rng), "mission_name": mission, "status": rng.choice(["In Progress", "Completed", "On Hold"]),
+                "description": paragraph(rng, []), "notes": "",
+            } for mission in rng.sample(MISSIONS, 2)],
+        }
+        session_docs.append({
+            "id": uuid_from(rng),
+            "title": f"Session {number + 1}: {structured['session_goal']}",
+            "campaign_id": campaign_id,
+            "content": "\n\n".join(paragraph(rng, met) for _ in range(paragraphs)),
+            "structured_data": structured,
+            "session_type": "structured",
+            "npcs_mentioned": met,
+            "created_at": created_at,
+            "updated_at": created_at + timedelta(hours=rng.randint(1, 72)),
+        })
+
+    npc_docs = []
+    interaction_docs = []
+    for npc_id, name in zip(npc_ids, npc_names):
+        entries = []
+        for _ in range(history):
+            session = rng.choice(session_docs) if session_docs else None
+            entries.append({
+                "id": uuid_from(rng),
+                "npc_id": npc_id,
+                "session_id": session["id"] if session else "",
+                "interaction": paragraph(rng, [name]),
+                "timestamp": (session["created_at"] if session else started) + timedelta(minutes=rng.randint(0, 240)),
+            })
+        entries.sort(key=lambda entry: entry["timestamp"])
+        embedded = [{key: entry[key] for key in ("session_id", "interaction", "timestamp")} for entry in entries]
+        npc = {
+            "id": npc_id,
+            "name": name,
+            "status": rng.choice(STATUSES),
+            "race": rng.choice(RACES),
+            "class_role": rng.choice(ROLES),
+            "appearance": "Weathered cloak, sharp eyes",
+            "quirks_mannerisms": "Taps the table when lying",
+            "background": paragraph(rng, [name]),
+            "notes": paragraph(rng, [name]),
+            "history": embedded if legacy_history else embedded[-NPC_RECENT_HISTORY:],
+            "created_at": entries[0]["timestamp"] if entries else started,
+            "updated_at": entries[-1]["timestamp"] if entries else started,
+        }
+        # The migration picks up NPCs without interaction_count, so legacy NPCs must not have one
+        if not legacy_history:
+            npc["interaction_count"] = len(entries)
+            interaction_docs.extend(entries)
+        npc_docs.append(npc)
+
+    return {"campaigns": [campaign], "sessions": session_docs, "npcs": npc_docs, "npc_interactions": interaction_docs}
+
+
+def check_schema(documents):
+    """Validate one document per collection against the API models so generated data stays readable"""
+    for collection, model in (("campaigns", Campaign), ("sessions", Session), ("npcs", NPC),
+                              ("npc_interactions", NPCInteraction)):
+        if documents[collection]:
+            model(**documents[collection][0])
+
+
+app = typer.Typer(add_completion=False, help=__doc__.split("\n\n")[0].strip())
+
+
+@app.command()
+def generate(
+    mongo_url: str = typer.Option(os.environ.get("MONGO_URL", "mongodb://localhost:27017"), help="MongoDB connection string"),
+    database: str = typer.Option("dnd_notes_synthetic", help="Target database"),
+    campaigns: int = typer.Option(10, min=1, help="Number of campaigns"),
+    players: int = typer.Option(5, min=0, help="Players per campaign"),
+    sessions_per_campaign: int = typer.Option(100, min=0, help="Sessions per campaign"),
+    npcs_per_campaign: int = typer.Option(50, min=0, help="NPCs per campaign"),
+    history: int = typer.Option(40, min=0, help="Interactions per NPC"),
+    paragraphs: int = typer.Option(8, min=1, help="Free-form content paragraphs per session"),
+    seed: int = typer.Option(42, help="Same seed, same documents"),
+    batch_size: int = typer.Option(1000, min=1, help="Documents per insert_many"),
+    workers: int = typer.Option(4, min=1, help="Concurrent insert_many batches"),
+    processes: int = typer.Option(os.cpu_count() or 1, min=1, help="Processes generating campaigns"),
+    drop: bool = typer.Option(False, "--drop", help="Drop the generated collections first"),
+    legacy_history: bool = typer.Option(False, "--legacy-history", help="Embed full NPC history instead of npc_interactions"),
+    indexes: bool = typer.Option(True, help="Create the indexes the backend declares"),
+):
+    """Generate a deterministic campaign dataset and bulk insert it"""
+    client = MongoClient(mongo_url, maxPoolSize=workers + 1)
+    db = client[database]
+    if drop:
+        for name in COLLECTIONS:
+            db.drop_collection(name)
+    elif any(db[name].estimated_document_count() for name in COLLECTIONS):
+        typer.echo(f"{database} already has data; the same seed will collide with it (use --drop)", err=True)
+
+    counts = {name: 0 for name in COLLECTIONS}
+    buffers = {name: [] for name in COLLECTIONS}
+    pending = []
+    schema_checked = False
+    start = time.perf_counter()
+
+    def flush(name, batch, executor):
+        pending.append(executor.submit(db[name].insert_many, batch, ordered=False))
+        counts[name] += len(batch)
+        # Bound the memory held by batches that are still being written
+        while len(pending) > 2 * workers:
+            pending.pop(0).result()
+
+    try:
+        build = partial(campaign_documents, seed, players=players, sessions=sessions_per_campaign,
+                        npcs=npcs_per_campaign, history=history, paragraphs=paragraphs, legacy_history=legacy_history)
+        with ThreadPoolExecutor(max_workers=workers) as executor, ProcessPoolExecutor(max_workers=processes) as generators:
+            # Generate a window of campaigns at a time so finished campaigns do not pile up in memory
+            for window in range(0, campaigns, 2 * processes):
+                for documents in generators.map(build, range(window, min(window + 2 * processes, campaigns))):
+                    if not schema_checked:
+                        check_schema(documents)
+                        schema_checked = True
+                    for name, docs in documents.items():
+                        buffer = buffers[name]
+                        buffer.extend(docs)
+                        while len(buffer) >= batch_size:
+                            flush(name, buffer[:batch_size], executor)
+                            del buffer[:batch_size]
+            for name, buffer in buffers.items():
+                if buffer:
+                    flush(name, buffer, executor)
+            for future in pending:
+                future.result()
+    except BulkWriteError as e:
+        typer.echo(f"Insert failed: {e.details.get('writeErrors', [{}])[0].get('errmsg')}", err=True)
+        raise typer.Exit(1)
+    elapsed = time.perf_counter() - start
+
+    if indexes:
+        for name in COLLECTIONS:
+            db[name].create_indexes(REQUIRED_INDEXES[name])
+
+    total = sum(counts.values())
+    summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+    typer.echo(f"Inserted {summary} into {database} in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} docs/s)")
+    client.close()
+
+
+if __name__ == "__main__":
+    app()
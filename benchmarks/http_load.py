@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+HTTP load benchmark for every route of the D&D Note-Taking API.
+
+Seeds a deterministic campaign (sessions, NPCs, players) through /api/import,
+then drives each route in server.api_router with a fixed number of requests at
+the configured concurrency and reports throughput and p50/p95/p99 latency.
+Routes that change data get their own pool of seeded documents so every run
+measures the same work. Run it against a local backend and a scratch database.
+
+Usage:
+    python benchmarks/http_load.py --base-url http://localhost:8001 --concurrency 16 --output baseline.json
+    python benchmarks/http_load.py --baseline baseline.json --max-regression 0.15 --output current.json
+    python benchmarks/http_load.py --routes "sessions" --requests 1000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from server import api_router  # noqa: E402
+
+# Importing server configures INFO logging, which would log every benchmark request
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+NARRATIVE = ("The party crossed the Ashfall pass and met Captain Varis the Bold at the ferry. "
+             "Mira Thornwood sold them potions while the dragon circled overhead. ")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples, errors, elapsed):
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+class Dataset:
+    """Ids of the seeded documents, generated from the seed so runs are repeatable"""
+
+    def __init__(self, seed, sessions, npcs, pool_size):
+        self.rng = random.Random(seed)
+        self.run_id = self.uuid()[:8]
+        self.campaign_id = self.uuid()
+        self.session_ids = [self.uuid() for _ in range(sessions)]
+        self.npc_ids = [self.uuid() for _ in range(npcs)]
+        self.npc_names = [f"Bench Npc {self.run_id} {i}" for i in range(npcs)]
+        # Documents consumed by routes that delete or modify what they touch
+        self.pools = {
+            "sessions": [self.uuid() for _ in range(pool_size)],
+            "npcs": [self.uuid() for _ in range(pool_size)],
+            "campaigns": [self.uuid() for _ in range(pool_size)],
+            "players": [self.uuid() for _ in range(2 * pool_size)],
+        }
+        self.created = {"sessions": [], "npcs": [], "campaigns": []}
+        self.job_id = None
+        # Job texts must differ between runs, otherwise POST /api/jobs only measures deduplication
+        self.nonce = uuid.uuid4().hex[:8]
+        self.profile_id = f"bench-{self.run_id}"
+
+    def uuid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def records(self):
+        now = datetime.utcnow().isoformat()
+        players = [{"id": pid, "name": f"Player {i}", "character_name": f"Hero {i}"}
+                   for i, pid in enumerate(self.pools["players"])]
+        yield {"type": "campaign", "data": {"id": self.campaign_id, "name": f"Bench Campaign {self.run_id}",
+                                            "description": "Load benchmark data", "players": players}}
+        for cid in self.pools["campaigns"]:
+            yield {"type": "campaign", "data": {"id": cid, "name": f"Bench Campaign {self.run_id} {cid[:8]}"}}
+        for i, sid in enumerate(self.session_ids + self.pools["sessions"]):
+            yield {"type": "session", "data": {
+                "id": sid, "title": f"Session {i}: The Road to Ashfall", "campaign_id": self.campaign_id,
+                "content": NARRATIVE * self.rng.randint(5, 40), "session_type": "free_form",
+                "npcs_mentioned": self.rng.sample(self.npc_names, min(3, len(self.npc_names))),
+                "created_at": now, "updated_at": now}}
+        for nid, name in zip(self.npc_ids, self.npc_names):
+            yield {"type": "npc", "data": {"id": nid, "name": name, "notes": "Met at the ferry"}}
+        for nid in self.pools["npcs"]:
+            yield {"type": "npc", "data": {"id": nid, "name": f"Bench Npc {self.run_id} {nid[:8]}"}}
+
+    def ndjson(self):
+        return "".join(json.dumps(record) + "\n" for record in self.records()).encode("utf-8")
+
+    def pick(self, ids, i):
+        return ids[i % len(ids)]
+
+
+def scenarios(data):
+    """Route template -> function building (method, url, request kwargs) for request i"""
+    cid = data.campaign_id
+
+    def session(i):
+        return data.pick(data.session_ids, i)
+
+    def npc(i):
+        return data.pick(data.npc_ids, i)
+
+    return {
+        "GET /api/": lambda i: ("GET", "/api/", {}),
+        "GET /api/auth/check": lambda i: ("GET", "/api/auth/check", {}),
+        "POST /api/sessions": lambda i: ("POST", "/api/sessions", {"json": {
+            "title": f"Bench session {data.run_id} {i}", "campaign_id": cid, "content": NARRATIVE * 10}}),
+        "GET /api/sessions": lambda i: ("GET", "/api/sessions", {"params": {"campaign_id": cid}}),
+        "GET /api/sessions/{session_id}": lambda i: ("GET", f"/api/sessions/{session(i)}", {}),
+        "PUT /api/sessions/{session_id}": lambda i: ("PUT", f"/api/sessions/{session(i)}", {"json": {
+            "title": f"Session retitled {i}"}}),
+        "DELETE /api/sessions/{session_id}": lambda i: ("DELETE", f"/api/sessions/{data.pools['sessions'][i]}", {}),
+        "PATCH /api/sessions/{session_id}/structured-data": lambda i: (
+            "PATCH", f"/api/sessions/{session(i)}/structured-data", {"json": {"operations": [
+                {"op": "add", "section": "loot", "item": {"item_name": f"Potion {i}", "value": "50 gp"}}]}}),
+        "GET /api/sessions/template/structured": lambda i: ("GET", "/api/sessions/template/structured", {}),
+        "GET /api/sessions/{session_id}/export": lambda i: ("GET", f"/api/sessions/{session(i)}/export", {}),
+        "POST /api/npcs": lambda i: ("POST", "/api/npcs", {"json": {"name": f"Bench Npc new {data.run_id} {i}"}}),
+        "GET /api/npcs": lambda i: ("GET", "/api/npcs", {}),
+        "GET /api/npcs/{npc_id}": lambda i: ("GET", f"/api/npcs/{npc(i)}", {}),
+        "PUT /api/npcs/{npc_id}": lambda i: ("PUT", f"/api/npcs/{npc(i)}", {"json": {"notes": f"Updated {i}"}}),
+        "DELETE /api/npcs/{npc_id}": lambda i: ("DELETE", f"/api/npcs/{data.pools['npcs'][i]}", {}),
+        "POST /api/extract-npc": lambda i: ("POST", "/api/extract-npc", {"json": {
+            "session_id": session(i), "npc_name": data.pick(data.npc_names, i),
+            "extracted_text": f"Interaction {i} at the ferry"}}),
+        "POST /api/extract-npcs": lambda i: ("POST", "/api/extract-npcs", {"json": {
+            "session_id": session(i), "items": [
+                {"npc_name": data.pick(data.npc_names, i + k), "extracted_text": f"Interaction {i}.{k}"}
+                for k in range(5)]}}),
+        "GET /api/npcs/{npc_id}/history": lambda i: ("GET", f"/api/npcs/{npc(i)}/history", {}),
+        "POST /api/migrate-npc-history": lambda i: ("POST", "/api/migrate-npc-history", {}),
+        "POST /api/suggest-npcs": lambda i: ("POST", "/api/suggest-npcs", {"json": {"text": NARRATIVE * 20}}),
+        "POST /api/jobs": lambda i: ("POST", "/api/jobs", {"json": {
+            "type": "suggest_npcs", "text": f"{NARRATIVE} Run {data.nonce} request {i}"}}),
+        "GET /api/jobs/{job_id}": lambda i: ("GET", f"/api/jobs/{data.job_id}", {}),
+        "GET /api/search": lambda i: ("GET", "/api/search", {"params": {"q": "dragon ferry"}}),
+        "POST /api/campaigns": lambda i: ("POST", "/api/campaigns", {"json": {
+            "name": f"Bench Campaign new {data.run_id} {i}"}}),
+        "GET /api/campaigns": lambda i: ("GET", "/api/campaigns", {}),
+        "GET /api/campaigns/{campaign_id}": lambda i: ("GET", f"/api/campaigns/{cid}", {}),
+        "PUT /api/campaigns/{campaign_id}": lambda i: ("PUT", f"/api/campaigns/{cid}", {"json": {
+            "description": f"Load benchmark data {i}"}}),
+        "DELETE /api/campaigns/{campaign_id}": lambda i: ("DELETE", f"/api/campaigns/{data.pools['campaigns'][i]}", {}),
+        "GET /api/campaigns/{campaign_id}/sessions": lambda i: ("GET", f"/api/campaigns/{cid}/sessions", {}),
+        "GET /api/campaigns/{campaign_id}/stats": lambda i: ("GET", f"/api/campaigns/{cid}/stats", {}),
+        "GET /api/campaigns/{campaign_id}/export": lambda i: ("GET", f"/api/campaigns/{cid}/export", {}),
+        "POST /api/campaigns/{campaign_id}/players": lambda i: ("POST", f"/api/campaigns/{cid}/players", {"json": {
+            "name": f"New player {data.run_id} {i}"}}),
+        "PUT /api/campaigns/{campaign_id}/players/{player_id}": lambda i: (
+            "PUT", f"/api/campaigns/{cid}/players/{data.pools['players'][2 * i]}", {"json": {
+                "name": f"Player {i}", "status": "Inactive"}}),
+        "DELETE /api/campaigns/{campaign_id}/players/{player_id}": lambda i: (
+            "DELETE", f"/api/campaigns/{cid}/players/{data.pools['players'][2 * i + 1]}", {}),
+        "POST /api/initialize-default-campaign": lambda i: ("POST", "/api/initialize-default-campaign", {}),
+        "POST /api/import": lambda i: ("POST", "/api/import", {"params": {"mode": "upsert"}, "content": "".join(
+            json.dumps({"type": "session", "data": {"id": sid, "title": f"Reimported {i}", "campaign_id": cid,
+                                                    "content": NARRATIVE * 5}}) + "\n"
+            for sid in data.session_ids[:10])}),
+        "GET /api/slow-queries": lambda i: ("GET", "/api/slow-queries", {}),
+        "DELETE /api/slow-queries": lambda i: ("DELETE", "/api/slow-queries", {}),
+        "GET /api/cache/stats": lambda i: ("GET", "/api/cache/stats", {}),
+        "GET /api/profiles/{request_id}": lambda i: ("GET", f"/api/profiles/{data.profile_id}", {}),
+    }
+
+
+# Routes whose requests each consume one pooled document; they run once per pool entry
+CONSUMING_ROUTES = {
+    "DELETE /api/sessions/{session_id}",
+    "DELETE /api/npcs/{npc_id}",
+    "DELETE /api/campaigns/{campaign_id}",
+    "PUT /api/campaigns/{campaign_id}/players/{player_id}",
+    "DELETE /api/campaigns/{campaign_id}/players/{player_id}",
+}
+
+# Created documents are collected from these responses so they can be removed afterwards
+CREATING_ROUTES = {
+    "POST /api/sessions": "sessions",
+    "POST /api/npcs": "npcs",
+    "POST /api/campaigns": "campaigns",
+}
+
+
+def router_routes():
+    return [f"{method} {route.path}" for route in api_router.routes for method in sorted(route.methods)]
+
+
+async def seed(client, data):
+    response = await client.post("/api/import", params={"mode": "upsert"}, content=data.ndjson(), timeout=300)
+    response.raise_for_status()
+    report = response.json()
+    if report["failed"]:
+        raise RuntimeError(f"Seeding failed: {report['errors'][:5]}")
+    response = await client.post("/api/jobs", json={"type": "suggest_npcs", "text": f"{NARRATIVE} {data.run_id}"})
+    response.raise_for_status()
+    data.job_id = response.json()["id"]
+    response = await client.get("/api/", params={"profile": "1"}, headers={"X-Request-ID": data.profile_id})
+    response.raise_for_status()
+
+
+async def cleanup(client, data):
+    deletions = [f"/api/sessions/{sid}" for sid in data.session_ids + data.pools["sessions"] + data.created["sessions"]]
+    deletions += [f"/api/npcs/{nid}" for nid in data.npc_ids + data.pools["npcs"] + data.created["npcs"]]
+    deletions += [f"/api/campaigns/{cid}" for cid in [data.campaign_id] + data.pools["campaigns"] + data.created["campaigns"]]
+    for url in deletions:
+        await client.delete(url)
+
+
+async def drive(client, route, build, data, count, concurrency):
+    """Send count requests with at most concurrency in flight; returns latencies, errors and wall time"""
+    samples = []
+    errors = 0
+    next_index = 0
+    created_key = CREATING_ROUTES.get(route)
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < count:
+            i = next_index
+            next_index += 1
+            method, url, kwargs = build(i)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                await response.aread()
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                response = None
+                failed = True
+            samples.append((time.perf_counter() - start) * 1000)
+            if failed:
+                errors += 1
+            elif created_key and response.headers.get("content-type", "").startswith("application/json"):
+                data.created[created_key].append(response.json().get("id"))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, errors, time.perf_counter() - start
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, metric, max_regression):
+    """Routes whose metric got worse than the baseline by more than max_regression"""
+    regressions = {}
+    for route, result in report["routes"].items():
+        before = baseline.get("routes", {}).get(route)
+        if not before or not before.get(metric):
+            continue
+        higher_is_better = metric == "throughput_rps"
+        change = (before[metric] - result[metric]) / before[metric] if higher_is_better \
+            else (result[metric] - before[metric]) / before[metric]
+        if change > max_regression:
+            regressions[route] = {"baseline": before[metric], "current": result[metric], "change": round(change, 3)}
+    return regressions
+
+
+async def run(args):
+    routes = router_routes()
+    data = Dataset(args.seed, args.sessions, args.npcs, args.requests + args.warmup)
+    builders = scenarios(data)
+    uncovered = [route for route in routes if route not in builders]
+    selected = [route for route in routes if route in builders and (not args.routes or re.search(args.routes, route))]
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, auth=(args.username, args.password), limits=limits,
+                                 timeout=args.timeout) as client:
+        await seed(client, data)
+        results = {}
+        try:
+            for route in selected:
+                build = builders[route]
+                # Warm-up requests come first in the pool so consuming routes never reuse a document
+                await drive(client, route, build, data, args.warmup, args.concurrency)
+                offset = args.warmup
+
+                def measured(i, build=build, offset=offset):
+                    return build(i + offset)
+
+                samples, errors, elapsed = await drive(client, route, measured, data, args.requests, args.concurrency)
+                results[route] = summarize(samples, errors, elapsed)
+                print(f"{route:<60}{results[route]['throughput_rps']:>10.1f} rps"
+                      f"{results[route]['p50_ms']:>10.2f}{results[route]['p95_ms']:>10.2f}{results[route]['p99_ms']:>10.2f} ms"
+                      f"{'  errors: ' + str(errors) if errors else ''}")
+        finally:
+            if not args.keep_data:
+                await cleanup(client, data)
+
+    report = {
+        "created_at": datetime.utcnow().isoformat(),
+        "revision": git_revision(),
+        "settings": {"base_url": args.base_url, "concurrency": args.concurrency, "requests": args.requests,
+                     "warmup": args.warmup, "sessions": args.sessions, "npcs": args.npcs, "seed": args.seed},
+        "uncovered_routes": uncovered,
+        "routes": results,
+    }
+    for route in uncovered:
+        print(f"No scenario for {route}; add one to scenarios()")
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.metric, args.max_regression)
+        report["regressions"] = regressions
+        for route, regression in regressions.items():
+            print(f"REGRESSION {route}: {args.metric} {regression['baseline']} -> {regression['current']} "
+                  f"({regression['change']:+.1%})")
+        if regressions:
+            exit_code = 1
+        else:
+            print(f"No {args.metric} regressions above {args.max_regression:.0%}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    return exit_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load benchmark every API route and report latency percentiles")
+    parser.add_argument("--base-url", default=os.environ.get("BENCH_BASE_URL", "http://localhost:8001"))
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per route")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per route")
+    parser.add_argument("--sessions", type=int, default=200, help="Seeded sessions")
+    parser.add_argument("--npcs", type=int, default=100, help="Seeded NPCs")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--routes", help="Only run routes matching this regular expression")
+    parser.add_argument("--keep-data", action="store_true", help="Do not delete the seeded documents")
+    parser.add_argument("--output", help="Optional JSON report path")
+    parser.add_argument("--baseline", help="Report to compare against; exits with status 1 on regressions")
+    parser.add_argument("--metric", default="p95_ms",
+                        choices=["mean_ms", "p50_ms", "p95_ms", "p99_ms", "throughput_rps"])
+    parser.add_argument("--max-regression", type=float, default=0.15,
+                        help="Allowed relative slowdown before a route counts as regressed")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
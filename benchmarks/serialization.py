@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Serialization cost of the session list endpoints.
+
+Compares the previous response path (Session(**doc) per item, re-validation
+through response_model, stdlib json encoding) with the trusted document path
+now used by server.py (shape the stored documents, encode with orjson).
+Needs no database: it builds realistic session documents in memory.
+
+Usage:
+    python benchmarks/serialization.py --sessions 1000 --repeat 20
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from server import Session, trusted_list_response  # noqa: E402
+
+SESSION_LIST_ADAPTER = TypeAdapter(List[Session])
+
+
+def make_session_document(rng, index, campaign_id):
+    created_at = datetime(2020, 1, 1) + timedelta(days=index * 7, microseconds=rng.randrange(1000) * 1000)
+
+    def item(**fields):
+        return {"id": str(uuid.UUID(int=rng.getrandbits(128))), **fields}
+
+    return {
+        "_id": index,
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "title": f"Session {index}: The Road to Ashfall",
+        "campaign_id": campaign_id,
+        "content": "The party pressed on through the rain-soaked pass. " * rng.randint(20, 80),
+        "session_type": "structured",
+        "npcs_mentioned": [f"Npc {rng.randrange(200)}" for _ in range(5)],
+        "structured_data": {
+            "session_number": index + 1,
+            "session_date": (created_at.date()).isoformat(),
+            "players_present": ["Thorin", "Elara", "Vex", "Brom"],
+            "session_goal": "Reach the monastery before nightfall",
+            "combat_encounters": [item(description="Ambush at the ford", enemies="Goblins x6",
+                                       outcome="Victory", notable_events="Brom fell in the river")
+                                  for _ in range(rng.randint(1, 4))],
+            "roleplay_encounters": [item(description="Haggling with the ferryman", npcs_involved=["Old Tom"],
+                                         outcome="Discount", importance="Low")
+                                    for _ in range(rng.randint(1, 4))],
+            "npcs_encountered": [item(npc_name=f"Npc {rng.randrange(200)}", role="Merchant", notes="",
+                                      first_encounter=False)
+                                 for _ in range(rng.randint(1, 6))],
+            "loot": [item(item_name="Potion of Healing", description="Restores 2d4+2", value="50 gp",
+                          recipient="Vex")
+                     for _ in range(rng.randint(0, 5))],
+            "notes": "Remember the ferryman's debt.",
+            "notable_roleplay_moments": ["Elara's speech at the shrine"],
+            "next_session_goals": "Find the abbot",
+            "overarching_missions": [item(mission_name="The Ashen Crown", status="In Progress",
+                                          description="Recover the crown", notes="")],
+        },
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def previous_path(documents):
+    """What a list endpoint did before: build models, re-validate via response_model, encode with json"""
+    models = [Session(**document) for document in documents]
+    content = [model.model_dump() for model in models]
+    validated = SESSION_LIST_ADAPTER.validate_python(content)
+    payload = SESSION_LIST_ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def trusted_path(documents):
+    return trusted_list_response(documents, Session).body
+
+
+def measure(function, documents, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        function(documents)
+        samples.append((time.process_time() - start) * 1000)
+    return {"median_cpu_ms": round(statistics.median(samples), 3), "min_cpu_ms": round(min(samples), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare list endpoint serialization paths")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    campaign_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    documents = [make_session_document(rng, i, campaign_id) for i in range(args.sessions)]
+
+    if json.loads(previous_path(documents)) != json.loads(trusted_path(documents)):
+        sys.exit("The two serialization paths produced different JSON")
+
+    previous = measure(previous_path, documents, args.repeat)
+    trusted = measure(trusted_path, documents, args.repeat)
+    report = {
+        "sessions": args.sessions,
+        "response_bytes": len(trusted_path(documents)),
+        "previous": previous,
+        "trusted": trusted,
+        "cpu_saved_ms_per_request": round(previous["median_cpu_ms"] - trusted["median_cpu_ms"], 3),
+        "speedup": round(previous["median_cpu_ms"] / trusted["median_cpu_ms"], 2) if trusted["median_cpu_ms"] else None,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Write path latency comparison for the D&D Note-Taking backend.
+
+Compares, per update route, the previous update_one + find_one round trips
+against the single find_one_and_update now used by server.py.
+Runs directly against MongoDB in a scratch database that is dropped before and
+after the run; its name must end in _bench so a real database is never dropped.
+
+Usage:
+    python benchmarks/write_path.py --mongo-url mongodb://localhost:27017 --iterations 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+    }
+
+
+async def timed(operation, iterations):
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await operation(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def seed(db, documents):
+    now = datetime.utcnow()
+    campaign_ids = [str(uuid.uuid4()) for _ in range(documents)]
+    await db.campaigns.insert_many([
+        {"id": cid, "name": f"Campaign {i}", "description": "x" * 200, "players": [], "is_active": True,
+         "created_at": now, "updated_at": now}
+        for i, cid in enumerate(campaign_ids)
+    ])
+    session_ids = [str(uuid.uuid4()) for _ in range(documents)]
+    await db.sessions.insert_many([
+        {"id": sid, "title": f"Session {i}", "campaign_id": campaign_ids[i % len(campaign_ids)],
+         "content": "The party travelled on. " * 200, "session_type": "free_form",
+         "created_at": now, "updated_at": now}
+        for i, sid in enumerate(session_ids)
+    ])
+    npc_ids = [str(uuid.uuid4()) for _ in range(documents)]
+    await db.npcs.insert_many([
+        {"id": nid, "name": f"Npc {i}", "status": "Unknown", "notes": "", "history": [], "interaction_count": 0,
+         "created_at": now, "updated_at": now}
+        for i, nid in enumerate(npc_ids)
+    ])
+    for collection in (db.campaigns, db.sessions, db.npcs, db.npc_interactions):
+        await collection.create_index("id", unique=True)
+    await db.npcs.create_index("name")
+    await db.npc_interactions.create_index([("npc_id", 1), ("timestamp", -1), ("id", -1)])
+    return {"sessions": session_ids, "npcs": npc_ids, "campaigns": campaign_ids}
+
+
+def read_after_write(collection, ids, field):
+    async def operation(i):
+        doc_id = ids[i % len(ids)]
+        update = {"$set": {field: f"value {i}", "updated_at": datetime.utcnow()}}
+        await collection.update_one({"id": doc_id}, update)
+        await collection.find_one({"id": doc_id})
+    return operation
+
+
+def single_round_trip(collection, ids, field):
+    async def operation(i):
+        doc_id = ids[i % len(ids)]
+        update = {"$set": {field: f"value {i}", "updated_at": datetime.utcnow()}}
+        await collection.find_one_and_update({"id": doc_id}, update, projection={"_id": 0},
+                                             return_document=ReturnDocument.AFTER)
+    return operation
+
+
+def extract_npc_before(db, count):
+    async def operation(i):
+        name = f"Npc {i % count}"
+        entry = {"session_id": "bench", "interaction": f"interaction {i}", "timestamp": datetime.utcnow()}
+        existing = await db.npcs.find_one({"name": name})
+        if existing:
+            await db.npcs.update_one({"name": name}, {"$push": {"history": entry},
+                                                      "$set": {"updated_at": datetime.utcnow()}})
+            await db.npcs.find_one({"name": name})
+    return operation
+
+
+def extract_npc_after(db, count):
+    """What extract_npc does now: one upsert on the NPC plus the insert into npc_interactions"""
+    async def operation(i):
+        name = f"Npc {i % count}"
+        now = datetime.utcnow()
+        entry = {"session_id": "bench", "interaction": f"interaction {i}", "timestamp": now}
+        npc = await db.npcs.find_one_and_update(
+            {"name": name},
+            {"$push": {"history": {"$each": [entry], "$slice": -5}}, "$inc": {"interaction_count": 1},
+             "$set": {"updated_at": now}, "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": now}},
+            projection={"_id": 0}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        await db.npc_interactions.insert_one({"id": str(uuid.uuid4()), "npc_id": npc["id"], **entry})
+    return operation
+
+
+async def run(args):
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.database]
+    await client.drop_database(args.database)
+    try:
+        ids = await seed(db, args.documents)
+        routes = {
+            "PUT /api/sessions/{id}": (read_after_write(db.sessions, ids["sessions"], "title"),
+                                       single_round_trip(db.sessions, ids["sessions"], "title")),
+            "PUT /api/npcs/{id}": (read_after_write(db.npcs, ids["npcs"], "notes"),
+                                   single_round_trip(db.npcs, ids["npcs"], "notes")),
+            "PUT /api/campaigns/{id}": (read_after_write(db.campaigns, ids["campaigns"], "description"),
+                                        single_round_trip(db.campaigns, ids["campaigns"], "description")),
+            "POST /api/extract-npc": (extract_npc_before(db, args.documents),
+                                      extract_npc_after(db, args.documents)),
+        }
+
+        report = {}
+        for route, (before, after) in routes.items():
+            await timed(before, args.warmup)
+            await timed(after, args.warmup)
+            before_stats = summarize(await timed(before, args.iterations))
+            after_stats = summarize(await timed(after, args.iterations))
+            saving = 1 - after_stats["mean_ms"] / before_stats["mean_ms"] if before_stats["mean_ms"] else 0.0
+            report[route] = {"before": before_stats, "after": after_stats, "mean_saving": round(saving, 3)}
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+    print(f"{'route':<28}{'before p50':>12}{'after p50':>12}{'before p95':>12}{'after p95':>12}{'saving':>9}")
+    for route, result in report.items():
+        print(f"{route:<28}{result['before']['p50_ms']:>12.3f}{result['after']['p50_ms']:>12.3f}"
+              f"{result['before']['p95_ms']:>12.3f}{result['after']['p95_ms']:>12.3f}{result['mean_saving']:>9.1%}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+SCRATCH_SUFFIX = "_bench"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare read-after-write and single round trip update paths")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="dnd_notes_write_path_bench", help=f"Scratch database, must end in {SCRATCH_SUFFIX}")
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+    if not args.database.endswith(SCRATCH_SUFFIX):
+        parser.error(f"--database {args.database} is dropped by this benchmark; use a scratch name ending in {SCRATCH_SUFFIX}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1272,7 +1272,9 @@ const NPCCard = ({ npc, onUpdate }) => {
       
       {npc.history && npc.history.length > 0 && (
         <div className="mt-4">
-          <span className="text-gray-400 text-sm">History:</span>
+          <span className="text-gray-400 text-sm">
+            History{npc.interaction_count > npc.history.length ? ` (latest ${npc.history.length} of ${npc.interaction_count})` : ''}:
+          </span>
           <div className="mt-2 space-y-2">
             {npc.history.map((entry, index) => (
               <div key={index} className="bg-gray-700 p-2 rounded text-sm">
@@ -1672,8 +1674,17 @@ const MainApp = ({ username, onLogout }) => {
 
   const fetchCampaignSessions = async (campaignId) => {
     try {
-      const response = await axios.get(`${API}/campaigns/${campaignId}/sessions`);
-      setSessions(response.data);
+      // Sessions come back one page at a time; X-Next-Cursor points at the next page
+      const campaignSessions = [];
+      let cursor = null;
+      do {
+        const response = await axios.get(`${API}/campaigns/${campaignId}/sessions`, {
+          params: cursor ? { cursor } : {}
+        });
+        campaignSessions.push(...response.data);
+        cursor = response.headers["x-next-cursor"];
+      } while (cursor);
+      setSessions(campaignSessions);
     } catch (err) {
       console.error("Error fetching campaign sessions:", err);
     }
@@ -1786,8 +1797,8 @@ const MainApp = ({ username, onLogout }) => {
   const handleDeleteCampaign = async (campaignId) => {
     // Check if this campaign has any sessions
     try {
-      const response = await axios.get(`${API}/campaigns/${campaignId}/sessions`);
-      setCampaignToDelete({ id: campaignId, sessionCount: response.data.length });
+      const response = await axios.get(`${API}/campaigns/${campaignId}/stats`);
+      setCampaignToDelete({ id: campaignId, sessionCount: response.data.session_count });
       setShowCampaignDeleteConfirm(true);
     } catch (err) {
       console.error("Error checking campaign sessions:", err);
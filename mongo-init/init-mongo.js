@@ -24,10 +24,18 @@ db.createUser({
 // Create collections with initial indexes for better performance
 db.createCollection('sessions');
 db.createCollection('npcs');
+db.createCollection('campaigns');
+db.createCollection('npc_interactions');
+db.createCollection('jobs'); // Background jobs (NPC suggestion, summaries)
+db.createCollection('llm_results'); // Memoised model output per paragraph
+db.createCollection('cache_versions'); // Read cache invalidation shared by backend workers
 db.createCollection('users'); // Add users collection for authentication
 
 // Create indexes for sessions collection
+// (the backend also verifies these at startup, see REQUIRED_INDEXES in backend/server.py)
 db.sessions.createIndex({ "id": 1 }, { unique: true });
+db.sessions.createIndex({ "campaign_id": 1, "created_at": -1, "id": -1 }); // Campaign session lists
+db.sessions.createIndex({ "created_at": -1, "id": -1 }); // Session list pagination
 db.sessions.createIndex({ "created_at": -1 });
 db.sessions.createIndex({ "session_type": 1 });
 db.sessions.createIndex({ "title": "text", "content": "text" }); // Full-text search
@@ -41,6 +49,28 @@ db.npcs.createIndex({ "created_at": -1 });
 db.npcs.createIndex({ "status": 1 });
 db.npcs.createIndex({ "name": "text", "background": "text", "notes": "text" }); // Full-text search
 
+// Create indexes for npc_interactions collection (full NPC history)
+db.npc_interactions.createIndex({ "id": 1 }, { unique: true });
+db.npc_interactions.createIndex({ "npc_id": 1, "timestamp": -1, "id": -1 });
+db.npc_interactions.createIndex({ "npc_id": 1, "timestamp": 1, "id": 1 }); // Campaign export, oldest first
+db.npc_interactions.createIndex({ "session_id": 1 });
+
+// Create indexes for campaigns collection
+db.campaigns.createIndex({ "id": 1 }, { unique: true });
+db.campaigns.createIndex({ "is_active": 1, "created_at": -1 });
+db.campaigns.createIndex({ "name": 1 });
+
+// Create indexes for jobs collection
+db.jobs.createIndex({ "id": 1 }, { unique: true });
+db.jobs.createIndex({ "dedupe_key": 1 }, { unique: true, sparse: true }); // Deduplicates identical pending work
+db.jobs.createIndex({ "status": 1, "run_after": 1 });
+db.jobs.createIndex({ "expires_at": 1 }, { expireAfterSeconds: 0 }); // Finished jobs expire
+
+// Create indexes for llm_results collection
+// (30 days; the backend changes the TTL to LLM_RESULT_TTL_SECONDS at startup)
+db.llm_results.createIndex({ "key": 1 }, { unique: true });
+db.llm_results.createIndex({ "last_used_at": 1 }, { expireAfterSeconds: 2592000 });
+
 // Create indexes for users collection
 db.users.createIndex({ "username": 1 }, { unique: true });
 db.users.createIndex({ "email": 1 }, { unique: true, sparse: true });
@@ -79,13 +109,14 @@ db.npcs.insertOne({
   "background": "Created to showcase the NPC management features",
   "notes": "This is a sample NPC. Feel free to edit or delete once you're familiar with the system.",
   "history": [],
+  "interaction_count": 0,
   "created_at": new Date(),
   "updated_at": new Date()
 });
 
 // Print initialization completion message
 print('D&D Notes database initialized successfully!');
-print('Created collections: sessions, npcs, users');
+print('Created collections: sessions, npcs, campaigns, npc_interactions, jobs, llm_results, cache_versions, users');
 print('Created indexes for better performance');
 print('Created application user: dnd_app_user');
 print('Added sample data (delete when ready)');
@@ -0,0 +1,169 @@
+"""
+OllamaLLMService against a stubbed Ollama server (httpx.MockTransport):
+streamed token assembly, rule-based fallbacks and the concurrency bound.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import orjson
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from server import OllamaLLMService, OllamaUnavailable  # noqa: E402
+
+
+def stream_body(*chunks):
+    return b"".join(orjson.dumps(chunk) + b"\n" for chunk in chunks)
+
+
+def make_service(handler, **options):
+    return OllamaLLMService(base_url="http://ollama.test", transport=httpx.MockTransport(handler), **options)
+
+
+def test_generate_assembles_streamed_tokens():
+    requests = []
+
+    def handler(request):
+        requests.append(orjson.loads(request.content))
+        body = stream_body({"response": "Elara "}, {"response": "the "}, {"response": "Barmaid"}, {"response": "", "done": True})
+        return httpx.Response(200, content=body)
+
+    async def run():
+        service = make_service(handler)
+        tokens = []
+        try:
+            return await service.generate("prompt", on_token=tokens.append), tokens
+        finally:
+            await service.aclose()
+
+    text, tokens = asyncio.run(run())
+    assert text == "Elara the Barmaid"
+    assert tokens == ["Elara ", "the ", "Barmaid"]
+    assert requests[0]["stream"] is True and requests[0]["prompt"] == "prompt"
+
+
+def test_model_npc_names_from_json_output():
+    def handler(request):
+        return httpx.Response(200, content=stream_body({"response": '{"npcs": ["Borin Stonefist", "borin stonefist"]}', "done": True}))
+
+    async def run():
+        service = make_service(handler)
+        try:
+            return await service.extract_npcs_from_text("Borin Stonefist haggled")
+        finally:
+            await service.aclose()
+
+    assert asyncio.run(run()) == ["Borin Stonefist"]
+
+
+def test_timeout_falls_back_to_rule_based_extraction():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    async def run():
+        service = make_service(handler)
+        try:
+            first = await service.extract_npcs_from_text("The party met Elara Brightwater at the inn")
+            # The failed server is not retried until retry_after_seconds has passed
+            second = await service.extract_npcs_from_text("The party met Elara Brightwater at the inn")
+            return first, second, service.available
+        finally:
+            await service.aclose()
+
+    first, second, available = asyncio.run(run())
+    assert first == second == ["Elara Brightwater"]
+    assert available is False
+    assert len(calls) == 1
+
+
+def test_unreachable_server_falls_back_to_rule_based_summary():
+    def handler(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    async def run():
+        service = make_service(handler)
+        try:
+            return await service.summarize_interaction("x" * 150)
+        finally:
+            await service.aclose()
+
+    assert asyncio.run(run()) == "x" * 97 + "..."
+
+
+def test_non_object_stream_chunk_falls_back():
+    def handler(request):
+        return httpx.Response(200, content=b'[]\n"x"\n')
+
+    async def run():
+        service = make_service(handler)
+        try:
+            try:
+                await service.generate("prompt")
+            except OllamaUnavailable:
+                unavailable = True
+            else:
+                unavailable = False
+            service.unavailable_until = 0.0
+            summary = await service.summarize_interaction("short note")
+            return unavailable, summary
+        finally:
+            await service.aclose()
+
+    assert asyncio.run(run()) == (True, "short note")
+
+
+def test_semaphore_bounds_concurrent_generations():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, content=stream_body({"response": "ok", "done": True}))
+
+    async def run():
+        service = make_service(handler, max_concurrency=2)
+        try:
+            return await asyncio.gather(*(service.generate(f"prompt {i}") for i in range(8)))
+        finally:
+            await service.aclose()
+
+    assert asyncio.run(run()) == ["ok"] * 8
+    assert peak == 2
+
+
+def test_queue_timeout_raises_unavailable():
+    release = None
+
+    async def handler(request):
+        await release.wait()
+        return httpx.Response(200, content=stream_body({"response": "ok", "done": True}))
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        service = make_service(handler, max_concurrency=1, queue_timeout_seconds=0.01)
+        try:
+            busy = asyncio.ensure_future(service.generate("first"))
+            await asyncio.sleep(0)
+            try:
+                await service.generate("second")
+            except OllamaUnavailable:
+                queued_out = True
+            else:
+                queued_out = False
+            release.set()
+            return queued_out, await busy
+        finally:
+            await service.aclose()
+
+    assert asyncio.run(run()) == (True, "ok")